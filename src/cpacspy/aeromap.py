@@ -22,14 +22,16 @@ Author: Aidan Jungo
 
 """
 
+import hashlib
+import importlib.util
 import math
+import os
+from collections import OrderedDict
+from pathlib import Path
+from typing import TYPE_CHECKING
 
 import numpy as np
 import pandas as pd
-from ambiance import Atmosphere
-from tixi3.tixi3wrapper import Tixi3
-from matplotlib import pyplot as plt
-from scipy import stats
 
 from cpacspy.cpacsfunctions import (
     add_float_vector,
@@ -48,31 +50,643 @@ from cpacspy.utils import (
 
 from cpacspy.utils import MSG_STAB_NEUTRAL, MSG_STAB_NOT_ENOUGH, MSG_STAB_ONE_PARAM
 
+# Heavy dependencies (ambiance, matplotlib, scipy, pyarrow, tixi3) are only imported in the
+# functions which use them, to keep 'import cpacspy' fast
+if TYPE_CHECKING:
+    from tixi3.tixi3wrapper import Tixi3
 
-def get_filter(df, alt_list, mach_list, aos_list, aoa_list):
-    """Get a dataframe filter for a set of parameters lists."""
+PYARROW_INSTALLED = importlib.util.find_spec("pyarrow") is not None
+
+# LRU cache of ISA properties {altitude: (density, speed_of_sound)} and its maximum size
+ATMOSPHERE_CACHE = OrderedDict()
+ATMOSPHERE_CACHE_SIZE = 4096
+
+# Initial number of rows of the buffer used by 'add_row'
+BUFFER_MIN_SIZE = 64
+
+# Maximum number of filters and results kept in the cache of 'get'
+GET_CACHE_SIZE = 256
+
+# Maximum memory used by the arrays kept in each cache of 'get' (filtered rows and results) of
+# one AeroMap [bytes], larger arrays are not cached
+GET_CACHE_MAX_BYTES = 4 * 2**20
+
+# Possible behaviours for interpolation outside of the AeroMap domain
+OUT_OF_BOUNDS_OPTIONS = ["error", "nan", "clip", "extrapolate"]
+SCATTERED_OUT_OF_BOUNDS_OPTIONS = ["error", "nan", "nearest"]
+
+# Interpolation methods used to find the trim (cms = 0) inside a bracket of angle of attack
+TRIM_METHODS = ["linear", "spline"]
+
+# Iterations of the Newton method used to find the trim with the "spline" method
+TRIM_NEWTON_ITERATIONS = 10
+
+# File formats and figure reused by 'render_plot' in each process
+PLOT_FORMATS = ["png", "svg"]
+PLOT_FIGURE_CACHE = {}
+
+# Stability axes {axis: (parameter, coefficient, sign of the slope to be stable)}
+STABILITY_AXES = {
+    "longitudinal": ("angleOfAttack", "cms", -1),
+    "directional": ("angleOfSideslip", "cml", 1),
+    "lateral": ("angleOfSideslip", "cmd", -1),
+}
+
+# Storage policies of the AeroMap dataframe, parameters are always stored as float64
+# "float64": all columns as float64
+# "float32": coefficients as float32
+# "compact": coefficients as float32 and mostly NaN damping derivatives as sparse columns
+STORAGE_OPTIONS = ["float64", "float32", "compact"]
+
+# Minimum ratio of NaN in a damping derivatives column to store it as a sparse column
+SPARSE_NAN_RATIO = 0.5
+
+
+def get_filter_values(value):
+    """Get the list of values and ranges of a filter on a parameter. A filter can be a value, a
+    range (tuple), a list of them or a 1-D array-like of values (NumPy array, Series)."""
+
+    if isinstance(value, (np.ndarray, pd.Series, pd.Index)):
+        if np.ndim(value) > 1:
+            raise ValueError(f"Filter arrays must be 1-D, not {np.ndim(value)}-D!")
+        value = np.asarray(value).tolist()
+
+    return listify(value)
+
+
+def get_intervals(values, atol=0.0, rtol=0.0):
+    """Get the intervals [low, high] (bounds included) to match for a list of filter values.
+
+    A value 'v' is matched with a tolerance of 'atol + rtol * abs(v)', a range is given as a
+    tuple (min, max) where a bound set to None is not limited.
+
+    Args:
+        values (list): List of values and ranges to match
+        atol (float, optional): Absolute tolerance. Defaults to 0.0.
+        rtol (float, optional): Relative tolerance. Defaults to 0.0.
+
+    Returns:
+        low (np.ndarray): Lower bounds of the intervals
+        high (np.ndarray): Upper bounds of the intervals
+    """
+
+    if atol < 0 or rtol < 0:
+        raise ValueError("Tolerances 'atol' and 'rtol' must be positive!")
+
+    low = []
+    high = []
+    for value in values:
+        if isinstance(value, tuple):
+            if len(value) != 2:
+                raise ValueError(f"A range must be given as a tuple (min, max), not {value}!")
+            low.append(-np.inf if value[0] is None else value[0])
+            high.append(np.inf if value[1] is None else value[1])
+        else:
+            tol = atol + rtol * abs(value)
+            low.append(value - tol)
+            high.append(value + tol)
+
+    return np.array(low, dtype=float), np.array(high, dtype=float)
+
+
+def get_filter(df, alt_list, mach_list, aos_list, aoa_list, atol=0.0, rtol=0.0):
+    """Get a dataframe filter for a set of parameters lists. Lists can contain values and
+    ranges given as tuples (min, max), values are matched with the tolerances 'atol' and 'rtol'
+    (see 'get_intervals')."""
 
     filter = pd.Series(True, index=df.index)
 
-    if alt_list:
-        filter &= df["altitude"].isin(alt_list)
+    for param, values in zip(PARAMS, [alt_list, mach_list, aos_list, aoa_list]):
 
-    if mach_list:
-        filter &= df["machNumber"].isin(mach_list)
+        if not values:
+            continue
 
-    if aos_list:
-        filter &= df["angleOfSideslip"].isin(aos_list)
+        if not atol and not rtol and not any(isinstance(value, tuple) for value in values):
+            filter &= df[param].isin(values)
+            continue
 
-    if aoa_list:
-        filter &= df["angleOfAttack"].isin(aoa_list)
+        param_filter = pd.Series(False, index=df.index)
+        for low, high in zip(*get_intervals(values, atol, rtol)):
+            param_filter |= df[param].between(low, high)
+        filter &= param_filter
 
     return filter
 
 
+def get_filter_key(alt, mach, aos, aoa, atol=0.0, rtol=0.0):
+    """Get a hashable key from the filters on the parameters (see 'AeroMap.get'), or None if
+    one of the filters can not be hashed."""
+
+    key = tuple(tuple(get_filter_values(value)) for value in [alt, mach, aos, aoa])
+    key += (atol, rtol)
+
+    try:
+        hash(key)
+    except TypeError:
+        return None
+
+    return key
+
+
+def get_owned_nbytes(array):
+    """Get the memory kept alive by a NumPy array [bytes], i.e. its own data or the whole data
+    of the array it is a view of."""
+
+    return array.nbytes if array.base is None else array.base.nbytes
+
+
+def add_to_lru_cache(cache, key, value, max_size=GET_CACHE_SIZE, max_bytes=None, nbytes=0):
+    """Add a value in a LRU cache (OrderedDict of (value, nbytes)), the least recently used
+    values are removed when the cache is full.
+
+    Args:
+        cache (OrderedDict): LRU cache
+        key (hashable): Key of the value
+        value (object): Value to cache
+        max_size (int, optional): Maximum number of values. Defaults to GET_CACHE_SIZE.
+        max_bytes (int, optional): Maximum memory kept alive by the cached values, a value
+            larger than this limit is not cached. Defaults to None (no limit).
+        nbytes (int, optional): Memory kept alive by the value [bytes]. Defaults to 0.
+
+    """
+
+    if max_bytes is not None and nbytes > max_bytes:
+        return
+
+    cache[key] = (value, nbytes)
+    cache.move_to_end(key)
+    while len(cache) > max_size:
+        cache.popitem(last=False)
+
+    if max_bytes is not None:
+        total_nbytes = sum(value_nbytes for _, value_nbytes in cache.values())
+        while total_nbytes > max_bytes:
+            _, (_, value_nbytes) = cache.popitem(last=False)
+            total_nbytes -= value_nbytes
+
+
+def render_plot(plot_data):
+    """Render a plot in a file with the Agg backend (without pyplot). The same figure is
+    reused for all the plots rendered in a process.
+
+    Args:
+        plot_data (tuple): (x, y, x_label, y_label, title, file_path)
+
+    Returns:
+        file_path (str): Path of the rendered file
+    """
+
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    x, y, x_label, y_label, title, file_path = plot_data
+
+    if "figure" not in PLOT_FIGURE_CACHE:
+        figure = Figure()
+        FigureCanvasAgg(figure)
+        PLOT_FIGURE_CACHE["figure"] = (figure, figure.add_subplot())
+
+    figure, ax = PLOT_FIGURE_CACHE["figure"]
+    ax.clear()
+    ax.plot(x, y, marker="o")
+    ax.set_xlabel(x_label)
+    ax.set_ylabel(y_label)
+    ax.set_title(title)
+    figure.savefig(file_path)
+
+    return str(file_path)
+
+
+def plot_aeromaps_to_files(plots, output_dir, file_format="png", nb_proc=None):
+    """Render many plots of one or several AeroMaps to files, in parallel in a process pool.
+
+    Data are extracted from the AeroMaps in the current process, only the rendering is done
+    in the pool (with the Agg backend and one reused figure per process).
+
+    Args:
+        plots (list): List of plots given as (aeromap, x_param, y_param) or
+            (aeromap, x_param, y_param, filters) where filters is a dict with the optional
+            keys 'alt', 'mach', 'aos', 'aoa', 'atol' and 'rtol' (see 'AeroMap.get')
+        output_dir (str, Path): Directory where the files are written
+        file_format (str, optional): Format of the files ("png" or "svg"). Defaults to "png".
+        nb_proc (int, optional): Number of processes. Defaults to None (number of CPUs).
+
+    Returns:
+        file_paths (list): Paths of the rendered files, in the same order as 'plots'
+    """
+
+    if file_format not in PLOT_FORMATS:
+        raise ValueError(f"'file_format' must be one of {PLOT_FORMATS}, not '{file_format}'!")
+
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    plot_data = []
+    for i, plot in enumerate(plots):
+        aeromap, x_param, y_param = plot[:3]
+        filters = plot[3] if len(plot) > 3 else {}
+
+        x_y = aeromap.get([x_param, y_param], **filters)
+        title = ", ".join([aeromap.uid] + [f"{key}={value}" for key, value in filters.items()])
+        file_path = Path(output_dir, f"{aeromap.uid}_{y_param}_vs_{x_param}_{i}.{file_format}")
+        plot_data.append((x_y[:, 0], x_y[:, 1], x_param, y_param, title, file_path))
+
+    nb_proc = min(nb_proc or os.cpu_count() or 1, len(plot_data))
+    if nb_proc <= 1:
+        return [render_plot(data) for data in plot_data]
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=nb_proc) as executor:
+        chunksize = max(1, len(plot_data) // (4 * nb_proc))
+        return list(executor.map(render_plot, plot_data, chunksize=chunksize))
+
+
+def check_pyarrow_installed():
+    """Raise an error if pyarrow (needed for Arrow and Parquet files) is not installed."""
+
+    if not PYARROW_INSTALLED:
+        err_msg = """
+        Unable to import pyarrow. Please install pyarrow to use Arrow and Parquet files.
+        """
+        print(err_msg)
+        raise ModuleNotFoundError(err_msg)
+
+
+def get_vector_hash(vector):
+    """Get a hash of the content of a float vector (used to know if it must be saved again)."""
+
+    return hashlib.sha256(np.ascontiguousarray(vector, dtype=float).tobytes()).hexdigest()
+
+
+def get_state_key(alt, mach, aos, aoa):
+    """Get the hashable key of a flight state (alt, mach, aos, aoa) used by the AeroMap index."""
+
+    return (float(alt), float(mach), float(aos), float(aoa))
+
+
+def get_batch_df(data):
+    """Get a float dataframe from a batch of states (and coefficients) given as a DataFrame or
+    as a dictionary of arrays {column_name: array}. The 4 parameters must be given without NaN.
+    """
+
+    batch_df = pd.DataFrame(data, dtype=float).reset_index(drop=True)
+
+    missing_params = [param for param in PARAMS if param not in batch_df.columns]
+    if missing_params:
+        raise ValueError(f"Missing parameter(s) {missing_params} in the batch of states!")
+
+    if batch_df[PARAMS].isnull().values.any():
+        raise ValueError("The 4 parameters (alt,mach,aos,aoa) must not contain NaN value!")
+
+    return batch_df
+
+
+def get_state_hashes(df):
+    """Get a 64-bit hash of each state (alt, mach, aos, aoa) of a dataframe, as a uint64 array.
+    0.0 and -0.0 give the same hash, as they are the same state."""
+
+    return pd.util.hash_pandas_object(df[PARAMS] + 0.0, index=False).to_numpy()
+
+
+def get_duplicated_rows(df, hashes):
+    """Get the positions (in increasing order) of the rows of a dataframe which duplicate the
+    state of a previous row. Only the rows with colliding hashes are compared exactly.
+
+    Args:
+        df (DataFrame): Dataframe containing the 4 parameters columns
+        hashes (np.ndarray): Hashes of the states of the dataframe (see 'get_state_hashes')
+
+    """
+
+    order = np.argsort(hashes, kind="stable")
+    sorted_hashes = hashes[order]
+    collisions = sorted_hashes[1:] == sorted_hashes[:-1]
+    if not collisions.any():
+        return np.empty(0, dtype=int)
+
+    candidates = np.unique(np.concatenate([order[:-1][collisions], order[1:][collisions]]))
+    duplicated = df[PARAMS].iloc[candidates].duplicated().to_numpy()
+
+    return candidates[duplicated]
+
+
+def get_storage_dtype(column, storage, sparse=True):
+    """Get the type of a column of an AeroMap dataframe for a storage policy, or None if the
+    column is not numeric.
+
+    Args:
+        column (Series): Column of the dataframe of an AeroMap
+        storage (str): Storage policy, one of STORAGE_OPTIONS
+        sparse (bool, optional): If False, the column is never stored as a sparse column.
+            Defaults to True.
+
+    """
+
+    if not pd.api.types.is_numeric_dtype(column.dtype):
+        return None
+
+    if storage == "float64" or column.name in PARAMS:
+        return np.dtype(np.float64)
+
+    if (
+        sparse
+        and storage == "compact"
+        and column.name.startswith("dampingDerivatives_")
+        and len(column)
+        and column.isnull().mean() >= SPARSE_NAN_RATIO
+    ):
+        return pd.SparseDtype(np.float32, np.nan)
+
+    return np.dtype(np.float32)
+
+
+def get_storage_df(df, storage):
+    """Get a dataframe with its columns converted to the types of a storage policy. Only the
+    columns which do not already have the right type are converted.
+
+    Args:
+        df (DataFrame): Dataframe of an AeroMap
+        storage (str): Storage policy, one of STORAGE_OPTIONS
+
+    """
+
+    if storage == "float64":
+        return df
+
+    dtypes = {}
+    for col in df.columns:
+        dtype = get_storage_dtype(df[col], storage)
+        if dtype is not None and df[col].dtype != dtype:
+            dtypes[col] = dtype
+
+    if not dtypes:
+        return df
+
+    return df.astype(dtypes)
+
+
+def interpolate_on_grid(axes, tables, points, out_of_bounds="error"):
+    """Multilinear interpolation of values defined on a structured (full-factorial) grid.
+
+    Args:
+        axes (list): Sorted unique values of the grid for each dimension
+        tables (dict): Values on the grid {name: np.ndarray of shape (len(ax) for ax in axes)}
+        points (list): Coordinates of the points to interpolate, one array per dimension
+        out_of_bounds (str, optional): Behaviour for points outside of the grid, 'error' to
+            raise a ValueError, 'nan' to return NaN, 'clip' to use the closest value on the grid
+            or 'extrapolate' for a linear extrapolation. Defaults to 'error'.
+
+    Returns:
+        dict: Interpolated values {name: np.ndarray with the shape of the points}
+
+    """
+
+    if out_of_bounds not in OUT_OF_BOUNDS_OPTIONS:
+        raise ValueError(
+            f'Invalid out_of_bounds option "{out_of_bounds}"! \
+            Must be one of the following: {", ".join(OUT_OF_BOUNDS_OPTIONS)}'
+        )
+
+    points = np.broadcast_arrays(*[np.asarray(x, dtype=float) for x in points])
+    shape = points[0].shape
+    points = [x.ravel() for x in points]
+
+    outside = np.zeros(points[0].size, dtype=bool)
+    low_idx, weights = [], []
+
+    for ax, x in zip(axes, points):
+        outside |= (x < ax[0]) | (x > ax[-1])
+
+        if out_of_bounds == "clip":
+            x = np.clip(x, ax[0], ax[-1])
+
+        # Only one value in this dimension, no interpolation needed
+        if len(ax) == 1:
+            low_idx.append(np.zeros(x.size, dtype=np.intp))
+            weights.append(None)
+            continue
+
+        idx = np.clip(np.searchsorted(ax, x, side="right") - 1, 0, len(ax) - 2)
+        low_idx.append(idx)
+        weights.append((x - ax[idx]) / (ax[idx + 1] - ax[idx]))
+
+    if out_of_bounds == "error" and outside.any():
+        raise ValueError(
+            f"{np.count_nonzero(outside)} point(s) are outside of the AeroMap domain! \
+            Use another 'out_of_bounds' option to interpolate them."
+        )
+
+    # Sum the contributions of all the corners of the grid cells
+    interpolated = {name: np.zeros(points[0].size) for name in tables}
+    dims = [i for i, w in enumerate(weights) if w is not None]
+
+    for corner in range(2 ** len(dims)):
+        idx = list(low_idx)
+        corner_weight = np.ones(points[0].size)
+
+        for bit, dim in enumerate(dims):
+            if corner >> bit & 1:
+                idx[dim] = low_idx[dim] + 1
+                corner_weight = corner_weight * weights[dim]
+            else:
+                corner_weight = corner_weight * (1 - weights[dim])
+
+        for name, table in tables.items():
+            interpolated[name] += corner_weight * table[tuple(idx)]
+
+    for name in interpolated:
+        if out_of_bounds == "nan":
+            interpolated[name][outside] = np.nan
+        interpolated[name] = interpolated[name].reshape(shape)
+
+    return interpolated
+
+
+def linear_regression_by_group(codes, x, y, nb_groups=None):
+    """Closed-form least squares linear regression (y = slope * x + intercept) for several groups
+    of points at once. Groups with less than 2 distinct x values get NaN slope and intercept.
+
+    Args:
+        codes (np.ndarray): Group number of each point (integers from 0 to nb_groups-1)
+        x (np.ndarray): x value of each point
+        y (np.ndarray): y value of each point
+        nb_groups (int, optional): Number of groups. Defaults to None (max(codes)+1).
+
+    Returns:
+        slope (np.ndarray): Slope of the regression for each group
+        intercept (np.ndarray): Intercept of the regression for each group
+
+    """
+
+    n = np.bincount(codes, minlength=nb_groups or 0)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x_mean = np.bincount(codes, x, minlength=len(n)) / n
+        y_mean = np.bincount(codes, y, minlength=len(n)) / n
+        dx = x - x_mean[codes]
+        dy = y - y_mean[codes]
+        sxx = np.bincount(codes, dx * dx, minlength=len(n))
+        sxy = np.bincount(codes, dx * dy, minlength=len(n))
+
+        slope = np.where(sxx > 0, sxy / sxx, np.nan)
+
+    return slope, y_mean - slope * x_mean
+
+
+def get_hermite_slopes(x, y, codes):
+    """Get the slopes dy/dx at each point of sorted groups of points, used by a cubic Hermite
+    spline. Slopes are central differences inside a group and one-sided differences at its
+    ends (0 for groups of one point).
+
+    Args:
+        x (np.ndarray): Values of x, sorted inside each group
+        y (np.ndarray): Values of y
+        codes (np.ndarray): Group of each point (points of a group must be consecutive)
+
+    """
+
+    prev_idx = np.maximum(np.arange(len(x)) - 1, 0)
+    next_idx = np.minimum(np.arange(len(x)) + 1, len(x) - 1)
+
+    prev_idx = np.where(codes[prev_idx] == codes, prev_idx, np.arange(len(x)))
+    next_idx = np.where(codes[next_idx] == codes, next_idx, np.arange(len(x)))
+
+    dx = x[next_idx] - x[prev_idx]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(dx != 0, (y[next_idx] - y[prev_idx]) / dx, 0.0)
+
+
+def hermite_interpolation(y0, y1, d0, d1, h, s, derivative=False):
+    """Evaluate a cubic Hermite spline (or its derivative with respect to 's') on brackets.
+
+    Args:
+        y0, y1 (np.ndarray): Values at the start and end of the brackets
+        d0, d1 (np.ndarray): Slopes at the start and end of the brackets
+        h (np.ndarray): Length of the brackets
+        s (np.ndarray): Normalized position in the brackets (between 0 and 1)
+        derivative (bool, optional): If True, return the derivative. Defaults to False.
+
+    """
+
+    if derivative:
+        return (
+            (6 * s**2 - 6 * s) * (y0 - y1)
+            + (3 * s**2 - 4 * s + 1) * h * d0
+            + (3 * s**2 - 2 * s) * h * d1
+        )
+
+    return (
+        (2 * s**3 - 3 * s**2 + 1) * y0
+        + (s**3 - 2 * s**2 + s) * h * d0
+        + (-2 * s**3 + 3 * s**2) * y1
+        + (s**3 - s**2) * h * d1
+    )
+
+
+def save_triangulation(tri, cache_file):
+    """Save a Delaunay triangulation in a NumPy '.npz' file. Only the arrays and numbers of its
+    state are saved (no pickle), with the SciPy version which created them.
+
+    Args:
+        tri (Delaunay): Triangulation to save
+        cache_file (str, Path): Path of the '.npz' file
+
+    """
+
+    import scipy
+
+    state = {key: value for key, value in vars(tri).items() if value is not None}
+    none_attributes = [key for key, value in vars(tri).items() if value is None]
+
+    np.savez(
+        cache_file,
+        **state,
+        _none_attributes=np.array(none_attributes, dtype=str),
+        _scipy_version=np.array(scipy.__version__),
+    )
+
+
+def load_triangulation(cache_file, points):
+    """Load a Delaunay triangulation saved by 'save_triangulation'. The file is loaded without
+    pickle, None is returned if it can not be read, if it was saved by another SciPy version or
+    if its points are not the expected ones.
+
+    Args:
+        cache_file (str, Path): Path of the '.npz' file
+        points (np.ndarray): Points which must have been triangulated
+
+    """
+
+    import scipy
+    from scipy.spatial import Delaunay
+
+    try:
+        data = np.load(cache_file, allow_pickle=False)
+        if not isinstance(data, np.lib.npyio.NpzFile):
+            return None
+        with data:
+            state = {key: data[key] for key in data.files}
+    except (OSError, ValueError):
+        return None
+
+    if str(state.pop("_scipy_version", "")) != scipy.__version__:
+        return None
+
+    tri = Delaunay.__new__(Delaunay)
+    tri.__dict__.update({key: None for key in state.pop("_none_attributes", []).tolist()})
+    tri.__dict__.update(
+        {key: value.item() if value.ndim == 0 else value for key, value in state.items()}
+    )
+
+    try:
+        if not np.array_equal(tri.points, points):
+            return None
+    except AttributeError:
+        return None
+
+    return tri
+
+
+def get_atmosphere_properties(altitudes):
+    """Get ISA density and speed of sound for an array of altitudes.
+
+    Atmosphere properties are evaluated only once per unique altitude and kept in a LRU cache
+    (ATMOSPHERE_CACHE_SIZE altitudes), then broadcast back to the shape of the input array.
+
+    Args:
+        altitudes (np.ndarray): Array of altitudes [m]
+
+    Returns:
+        dens (np.ndarray): Air density at each altitude [kg/m^3]
+        sos (np.ndarray): Speed of sound at each altitude [m/s]
+    """
+
+    alt_unique, inverse = np.unique(altitudes, return_inverse=True)
+
+    properties = {
+        alt: ATMOSPHERE_CACHE[alt][0] for alt in alt_unique.tolist() if alt in ATMOSPHERE_CACHE
+    }
+    missing = [alt for alt in alt_unique.tolist() if alt not in properties]
+    if missing:
+        from ambiance import Atmosphere
+
+        atm = Atmosphere(missing)
+        properties.update(zip(missing, zip(atm.density, atm.speed_of_sound)))
+
+    for alt in alt_unique.tolist():
+        add_to_lru_cache(ATMOSPHERE_CACHE, alt, properties[alt], max_size=ATMOSPHERE_CACHE_SIZE)
+
+    dens_unique = np.array([properties[alt][0] for alt in alt_unique.tolist()], dtype=float)
+    sos_unique = np.array([properties[alt][1] for alt in alt_unique.tolist()], dtype=float)
+
+    return dens_unique[inverse], sos_unique[inverse]
+
+
 class AeroMap:
     """AeroMap class for CPACS AeroMap."""
 
-    def __init__(self, tixi: Tixi3, uid, create_new=False):
+    def __init__(self, tixi: "Tixi3", uid, create_new=False, storage="float64"):
         """Init aeromap class
 
         Args:
@@ -81,13 +695,32 @@ class AeroMap:
             create_new (bool, optional): If True crate a new AeroMap in TIXI,
                                          if False find it in the CPACS file.
                                          Defaults to False.
+            storage (str, optional): Storage policy of the dataframe, one of
+                                     STORAGE_OPTIONS. Defaults to "float64".
         """
 
+        if storage not in STORAGE_OPTIONS:
+            raise ValueError(f"'storage' must be one of {STORAGE_OPTIONS}, not '{storage}'!")
+
         self.tixi = tixi
         self.uid = uid
         self.name = uid
         self.description = ""
         self.atmospheric_model = "ISA"
+        self._index = None
+        self._buffer = None
+        self._buffer_size = 0
+        self._version = 0
+        self._grid = None
+        self._triangulation = None
+        self._saved_hashes = {}
+        self._sorted_indexes = {}
+        self._sorted_indexes_version = None
+        self._rows_cache = OrderedDict()
+        self._get_cache = OrderedDict()
+        self._get_cache_version = None
+        self._storage = storage
+        self._shared_columns = set()
         self.df = pd.DataFrame(columns=PARAMS_COEFS, dtype=float)
 
         if create_new:
@@ -110,6 +743,229 @@ class AeroMap:
 
             self.get_param_and_coef_from_cpacs()
 
+    @property
+    def df(self):
+        """Dataframe containing all the parameters and coefficients of the AeroMap."""
+        self._flush_buffer()
+        return self._df
+
+    @df.setter
+    def df(self, new_df):
+        self._df = get_storage_df(new_df, self._storage)
+        self._shared_columns = set()
+        self._index = None
+        self._buffer = None
+        self._buffer_size = 0
+        self._version += 1
+
+    @property
+    def storage(self):
+        """Storage policy of the dataframe (see STORAGE_OPTIONS), the columns are converted
+        when it is changed."""
+        return self._storage
+
+    @storage.setter
+    def storage(self, storage):
+        if storage not in STORAGE_OPTIONS:
+            raise ValueError(f"'storage' must be one of {STORAGE_OPTIONS}, not '{storage}'!")
+
+        self._flush_buffer()
+        self._storage = storage
+        if storage == "float64":
+            numeric_cols = self._df.select_dtypes("number").columns
+            self._df = self._df.astype({col: float for col in numeric_cols})
+        else:
+            self._df = get_storage_df(self._df, storage)
+        self._version += 1
+
+    @property
+    def version(self):
+        """Counter incremented each time the AeroMap is modified through its methods or when
+        'df' is replaced. It is used to invalidate the data cached by the AeroMap."""
+        return self._version
+
+    def _flush_buffer(self):
+        """Append the rows staged in the buffer by 'add_row' to the dataframe."""
+
+        if not self._buffer_size:
+            return
+
+        df_buffer = get_storage_df(
+            pd.DataFrame(self._buffer[: self._buffer_size], columns=PARAMS_COEFS), self._storage
+        )
+        self._df = get_storage_df(
+            pd.concat([self._df, df_buffer], ignore_index=True), self._storage
+        )
+
+        self._buffer = None
+        self._buffer_size = 0
+
+    def _get_index(self):
+        """Get the index {(alt, mach, aos, aoa): [row positions]} of the AeroMap states.
+
+        The index is built lazily and dropped every time the dataframe is replaced. It is also
+        rebuilt if the number of rows changed since it was built (e.g. rows appended directly
+        to 'df'). Direct modifications of the parameters columns of 'df' are not tracked.
+        Rows staged in the buffer by 'add_row' are indexed at their future position.
+        """
+
+        if self._index is None or self._index_size != len(self._df) + self._buffer_size:
+
+            # Rows changed behind the index, data cached for the previous rows are invalidated
+            # (when the index was dropped, the version has already been incremented)
+            if self._index is not None:
+                self._version += 1
+
+            self._flush_buffer()
+            self._index = {}
+            if not self._df.empty:
+                columns = [self._df[param].tolist() for param in PARAMS]
+                for pos, key in enumerate(zip(*columns)):
+                    self._index.setdefault(key, []).append(pos)
+
+            self._index_size = len(self._df)
+
+        return self._index
+
+    def copy_df_from(self, aeromap):
+        """Copy the dataframe of another AeroMap with copy-on-write. The data of the columns
+        are shared by the two AeroMaps until one of them modifies a column with its methods,
+        then only this column is copied. Direct in place modifications of 'df' (e.g. with
+        'df.loc') are not detected and would modify both AeroMaps.
+
+        Args:
+            aeromap (AeroMap): AeroMap to copy the dataframe from
+
+        """
+
+        self.df = aeromap.df.copy(deep=False)
+
+        shared_columns = set(self._df.columns)
+        self._shared_columns = shared_columns
+        aeromap._shared_columns |= shared_columns
+
+    def df_from_arrow(self, table):
+        """Set the dataframe from the columns of an Apache Arrow table (e.g. from 'to_arrow').
+
+        float64 columns without null values are used without copy, they are shared with the
+        table until the AeroMap modifies them with its methods, then only this column is copied.
+
+        Args:
+            table (pyarrow.Table): Arrow table with one column per parameter or coefficient
+
+        """
+
+        # One block per column, to get views of the Arrow buffers instead of a consolidated copy
+        self.df = table.to_pandas(split_blocks=True).astype(float, copy=False)
+
+        self._shared_columns = {
+            col
+            for col in self._df.columns
+            if isinstance(self._df[col].dtype, np.dtype)
+            and any(
+                np.shares_memory(self._df[col].to_numpy(), chunk.to_numpy(zero_copy_only=False))
+                for chunk in table.column(col).chunks
+            )
+        }
+
+    def _own_columns(self, columns):
+        """Copy the columns which share their data with another AeroMap (see 'copy_df_from') or
+        with a vector returned by 'get', before they are modified in place."""
+
+        for col in columns:
+            if col in self._shared_columns:
+                self._df[col] = self._df[col].copy()
+                self._shared_columns.discard(col)
+
+    def _densify(self, col):
+        """Convert a sparse column of the dataframe to a dense one, to be able to modify it."""
+
+        if col in self.df.columns and isinstance(self._df[col].dtype, pd.SparseDtype):
+            self._df[col] = self._df[col].sparse.to_dense()
+
+    def _apply_storage(self, columns):
+        """Convert only the given columns of the dataframe to the types of the storage policy,
+        e.g. after they have been modified. Modified columns are kept dense (they are not
+        scanned for NaN after each modification), sparse columns are restored by 'save'."""
+
+        if self._storage == "float64":
+            return
+
+        for col in columns:
+            dtype = get_storage_dtype(self._df[col], self._storage, sparse=False)
+            if dtype is not None and self._df[col].dtype != dtype:
+                self._df[col] = self._df[col].astype(dtype)
+
+    def _get_sorted_index(self, param):
+        """Get the sorted index of a parameter, i.e. the row positions which sort the parameter
+        column and the sorted values. Sorted indexes are built lazily and dropped every time
+        the AeroMap is modified.
+        """
+
+        df = self.df
+        if self._sorted_indexes_version != self._version:
+            self._sorted_indexes = {}
+            self._sorted_indexes_version = self._version
+
+        if param not in self._sorted_indexes or len(self._sorted_indexes[param][0]) != len(df):
+            values = df[param].to_numpy(dtype=float)
+            order = np.argsort(values, kind="stable")
+            self._sorted_indexes[param] = (order, values[order])
+
+        return self._sorted_indexes[param]
+
+    def get_filtered_rows(self, alt=None, mach=None, aos=None, aoa=None, atol=0.0, rtol=0.0):
+        """Get the positions (in increasing order) of the rows matching a filter on the
+        parameters. Each parameter is searched by binary search in its sorted index.
+
+        Args:
+            alt (float, tuple, list, optional): Altitudes or ranges to filter. Defaults to None.
+            mach (float, tuple, list, optional): Mach numbers or ranges to filter.
+            aos (float, tuple, list, optional): Angles of sideslip or ranges to filter.
+            aoa (float, tuple, list, optional): Angles of attack or ranges to filter.
+            atol (float, optional): Absolute tolerance on the values. Defaults to 0.0.
+            rtol (float, optional): Relative tolerance on the values. Defaults to 0.0.
+
+        """
+
+        rows = None
+
+        for param, value in zip(PARAMS, [alt, mach, aos, aoa]):
+
+            values = get_filter_values(value)
+            if not values:
+                continue
+
+            order, sorted_values = self._get_sorted_index(param)
+            low, high = get_intervals(values, atol, rtol)
+            start = np.searchsorted(sorted_values, low, side="left")
+            end = np.searchsorted(sorted_values, high, side="right")
+
+            param_rows = np.unique(np.concatenate([order[i:j] for i, j in zip(start, end)]))
+
+            if rows is None:
+                rows = param_rows
+            else:
+                rows = np.intersect1d(rows, param_rows, assume_unique=True)
+
+        if rows is None:
+            return np.arange(len(self.df))
+
+        return rows
+
+    def get_rows(self, alt, mach, aos, aoa):
+        """Get the positions of the rows corresponding to a flight state (empty if not found).
+
+        Args:
+            alt (float): Altitude
+            mach (float): Mach number
+            aos (float): Angle of sideslip
+            aoa (float): Angle of attack
+
+        """
+
+        return self._get_index().get(get_state_key(alt, mach, aos, aoa), [])
+
     def get_param_and_coef_from_cpacs(self):
         """Get the parameters and coefficients from the aeroMap of a CPACS file."""
 
@@ -120,7 +976,7 @@ class AeroMap:
             param_xpath = self.xpath + f"/{param}"
 
             if self.tixi.checkElement(param_xpath):
-                param_dict[param] = get_float_vector(self.tixi, param_xpath)
+                param_dict[param] = get_float_vector(self.tixi, param_xpath, as_array=True)
             else:
                 raise ValueError(f'No value has been found for "{param}" in "{self.uid}" aeroMap!')
 
@@ -129,7 +985,7 @@ class AeroMap:
             coef_xpath = self.xpath + f"/{coef}"
 
             if self.tixi.checkElement(coef_xpath):
-                param_dict[coef] = get_float_vector(self.tixi, coef_xpath)
+                param_dict[coef] = get_float_vector(self.tixi, coef_xpath, as_array=True)
 
         # Get damping derivatives coefficients
         for rates in ["negativeRates", "positiveRates"]:
@@ -139,7 +995,7 @@ class AeroMap:
                 coef_xpath = self.xpath + f"/dampingDerivatives/{rates}/{damping_coef}"
 
                 if self.tixi.checkElement(coef_xpath):
-                    param_dict[col_name] = get_float_vector(self.tixi, coef_xpath)
+                    param_dict[col_name] = get_float_vector(self.tixi, coef_xpath, as_array=True)
 
         # Get incrementMaps coefficients
         # TODO
@@ -147,28 +1003,159 @@ class AeroMap:
         df_param = pd.DataFrame(param_dict)
         self.df = pd.concat([self.df, df_param], axis=0)
 
-    def get(self, list_of, alt=None, mach=None, aos=None, aoa=None):
+        # Vectors as they are stored (in the CPACS file precision for the "float64" storage),
+        # only modified ones will be saved again
+        self._saved_hashes = {
+            col: get_vector_hash(self._df[col].to_numpy(dtype=float)) for col in param_dict
+        }
+
+    def get(
+        self,
+        list_of,
+        alt=None,
+        mach=None,
+        aos=None,
+        aoa=None,
+        atol=0.0,
+        rtol=0.0,
+        structured=False,
+    ):
         """Get parameter or coeffs as a numpy vector with other parameters as filter (optional).
 
+        Filters can be values, ranges given as tuples (min, max) or lists of both, e.g.
+        get("cl", mach=(0.3, 0.8), aoa=[0.0, 2.0], atol=1e-6).
+
+        With a list of columns, the filter is evaluated once and a 2-D array (one column per
+        parameter or coefficient) or a structured array (one field per column) is returned.
+        When the selected rows are contiguous, the vector of a single column is a view of the
+        dataframe data, the column is copied before it is modified by the AeroMap methods.
+
+        Results are kept in a LRU cache (returned arrays are read-only) bounded in number
+        (GET_CACHE_SIZE) and in memory (GET_CACHE_MAX_BYTES), until the AeroMap is modified
+        through its methods or 'df' is replaced. Direct modifications of the values of 'df'
+        are not tracked.
+
         Args:
-            list_of (str): Parameter or coefficient to get.
+            list_of (str, list): Parameter or coefficient to get, or list of them.
             alt (list, optional): List of altitudes to filter. Defaults to None.
             mach (list, optional): List of Mach numbers to filter. Defaults to None.
             aos (list, optional): List of angle of sideslip to filter. Defaults to None.
             aoa (list, optional): List of angle of attack to filter. Defaults to None.
+            atol (float, optional): Absolute tolerance on the values. Defaults to 0.0.
+            rtol (float, optional): Relative tolerance on the values. Defaults to 0.0.
+            structured (bool, optional): If True and 'list_of' is a list, return a structured
+                array instead of a 2-D array. Defaults to False.
 
         """
 
-        alt_list = listify(alt)
-        mach_list = listify(mach)
-        aos_list = listify(aos)
-        aoa_list = listify(aoa)
+        # Results are cached until the AeroMap is modified, cached arrays are read-only
+        filter_key = get_filter_key(alt, mach, aos, aoa, atol, rtol)
+        if filter_key is not None:
+            self._check_get_cache()
+            result_key = (tuple(listify(list_of)), isinstance(list_of, list), structured)
+            result_key += filter_key
+            if result_key in self._get_cache:
+                self._get_cache.move_to_end(result_key)
+                return self._get_cache[result_key][0]
+
+        rows = None
+        if filter_key is not None and filter_key in self._rows_cache:
+            rows = self._rows_cache[filter_key][0]
+        if rows is None:
+            rows = self._get_rows_from_filters(alt, mach, aos, aoa, atol, rtol)
+
+        # Contiguous rows are selected with a slice to get views instead of copies
+        if not len(rows):
+            selection = slice(0, 0)
+        elif rows[-1] - rows[0] + 1 == len(rows):
+            selection = slice(rows[0], rows[-1] + 1)
+        else:
+            selection = rows
+
+        df = self.df
+        columns = listify(list_of)
+        vectors = []
+        for col in columns:
+            if df[col].dtype == np.float64:
+                vectors.append(df[col].to_numpy()[selection])
+            else:
+                # Only the selected rows are converted, not to keep a copy of the whole column
+                vectors.append(df[col].iloc[selection].to_numpy(dtype=float))
+
+        is_view = (
+            not isinstance(list_of, list)
+            and isinstance(selection, slice)
+            and df[columns[0]].dtype == np.float64
+        )
+
+        if not isinstance(list_of, list):
+            result = vectors[0]
+            # The view is given away, the column must be copied before the next in place
+            # modification to keep the returned vector unchanged (see '_own_columns')
+            if is_view:
+                self._shared_columns.add(columns[0])
+        elif structured:
+            result = np.empty(len(rows), dtype=[(col, float) for col in list_of])
+            for col, vector in zip(list_of, vectors):
+                result[col] = vector
+        elif vectors:
+            result = np.column_stack(vectors)
+        else:
+            result = np.empty((len(rows), 0))
+
+        if filter_key is not None:
+            self._check_get_cache()
+            result.setflags(write=False)
+            add_to_lru_cache(
+                self._rows_cache,
+                filter_key,
+                rows,
+                max_bytes=GET_CACHE_MAX_BYTES,
+                nbytes=get_owned_nbytes(rows),
+            )
+            # Views of the dataframe do not keep any other memory alive
+            add_to_lru_cache(
+                self._get_cache,
+                result_key,
+                result,
+                max_bytes=GET_CACHE_MAX_BYTES,
+                nbytes=0 if is_view else get_owned_nbytes(result),
+            )
 
-        filt = get_filter(self.df, alt_list, mach_list, aos_list, aoa_list)
+        return result
+
+    def _check_get_cache(self):
+        """Clear the cache of 'get' if the AeroMap has been modified since it was filled."""
+
+        if self._get_cache_version != self._version:
+            self._rows_cache.clear()
+            self._get_cache.clear()
+            self._get_cache_version = self._version
+
+    def _get_rows_from_filters(self, alt, mach, aos, aoa, atol, rtol):
+        """Get the positions of the rows matching the filters of 'get'."""
+
+        alt_list = get_filter_values(alt)
+        mach_list = get_filter_values(mach)
+        aos_list = get_filter_values(aos)
+        aoa_list = get_filter_values(aoa)
+        param_lists = [alt_list, mach_list, aos_list, aoa_list]
+
+        # Exact flight state, use the index instead of filtering the whole dataframe
+        if (
+            not atol
+            and not rtol
+            and all(len(lst) == 1 and not isinstance(lst[0], tuple) for lst in param_lists)
+        ):
+            return np.array(
+                self.get_rows(alt_list[0], mach_list[0], aos_list[0], aoa_list[0]), dtype=int
+            )
 
-        return self.df.loc[filt, list_of].to_numpy()
+        return self.get_filtered_rows(*param_lists, atol=atol, rtol=rtol)
 
-    def get_damping_derivatives(self, coef, axis, rates, alt=None, mach=None, aos=None, aoa=None):
+    def get_damping_derivatives(
+        self, coef, axis, rates, alt=None, mach=None, aos=None, aoa=None, atol=0.0, rtol=0.0
+    ):
         """Get damping derivatives coefficients as a numpy vector with other parameters as
         filter (optional).
 
@@ -180,6 +1167,8 @@ class AeroMap:
             mach (float, optional): Mach number
             aos (float, optional): Angle of sideslip
             aoa (float, optional): Angle of attack
+            atol (float, optional): Absolute tolerance on the parameters. Defaults to 0.0.
+            rtol (float, optional): Relative tolerance on the parameters. Defaults to 0.0.
 
         """
 
@@ -215,7 +1204,308 @@ class AeroMap:
                 with {rates_name} has not been found!"
             )
 
-        return self.get(col_name, alt=alt, mach=mach, aos=aos, aoa=aoa)
+        return self.get(col_name, alt=alt, mach=mach, aos=aos, aoa=aoa, atol=atol, rtol=rtol)
+
+    def iter_polars(self, by=None, columns=None):
+        """Iterate over the polars of the AeroMap, i.e. the sweeps of one parameter for each
+        combination of the parameters given in 'by'.
+
+        The AeroMap is sorted only once, then each polar is yielded as a read-only view (no
+        copy) of a structured array. By default, polars are the angle of attack sweeps for each
+        (altitude, Mach number, angle of sideslip), use by=["altitude", "machNumber",
+        "angleOfAttack"] to iterate over the angle of sideslip sweeps.
+
+        Args:
+            by (list, optional): Parameters which define the polars. Defaults to None
+                (altitude, Mach number and angle of sideslip).
+            columns (list, optional): Columns to get in the polars. Defaults to None (all).
+
+        Yields:
+            group (tuple): Values of the 'by' parameters
+            polar (np.ndarray): Structured array with one field per column, sorted by the
+                other parameters
+
+        """
+
+        if by is None:
+            by = ["altitude", "machNumber", "angleOfSideslip"]
+        else:
+            by = listify(by)
+
+        wrong_params = [param for param in by if param not in PARAMS]
+        if wrong_params or not by:
+            raise ValueError(f"'by' must be a list of parameters from {PARAMS}!")
+
+        df = self.df
+        if columns is None:
+            columns = df.select_dtypes("number").columns.tolist()
+
+        # Sort by the 'by' parameters first, then by the other parameters
+        sort_params = by + [param for param in PARAMS if param not in by]
+        param_vectors = {param: df[param].to_numpy(dtype=float) for param in sort_params}
+        order = np.lexsort([param_vectors[param] for param in reversed(sort_params)])
+
+        data = np.empty(len(df), dtype=[(col, float) for col in columns])
+        for col in columns:
+            data[col] = df[col].to_numpy(dtype=float)[order]
+        data.setflags(write=False)
+
+        if not len(data):
+            return
+
+        # Boundaries of the groups, where one of the 'by' parameters changes
+        keys = np.column_stack([param_vectors[param][order] for param in by])
+        starts = np.concatenate([[0], np.flatnonzero(np.any(keys[1:] != keys[:-1], axis=1)) + 1])
+        ends = np.append(starts[1:], len(data))
+
+        for start, end in zip(starts, ends):
+            yield tuple(keys[start].tolist()), data[start:end]
+
+    def _get_grid(self, coefs):
+        """Get the structured grid of the AeroMap and the tables of the coefficients on it.
+
+        The grid is detected from the unique values of the 4 parameters and must be
+        full-factorial (one state for each combination of the parameters). Grid and tables
+        are cached until the AeroMap is modified.
+
+        Args:
+            coefs (list): List of coefficients for which the tables are needed
+
+        Returns:
+            axes (list): Sorted unique values of each parameter
+            tables (dict): Tables of the coefficients {coef: np.ndarray (4 dimensions)}
+
+        """
+
+        index = self._get_index()
+
+        if self._grid is None or self._grid["version"] != self._version:
+
+            df = self.df
+            axes, codes = [], []
+            for param in PARAMS:
+                ax, code = np.unique(df[param].to_numpy(dtype=float), return_inverse=True)
+                axes.append(ax)
+                codes.append(code)
+
+            shape = tuple(len(ax) for ax in axes)
+            if len(df) != len(index) or len(df) != np.prod(shape):
+                raise ValueError(
+                    f'"{self.uid}" aeroMap is not a full-factorial grid of the 4 parameters, \
+                    it cannot be interpolated with a multilinear interpolation!'
+                )
+
+            self._grid = {
+                "version": self._version,
+                "axes": axes,
+                "shape": shape,
+                "flat_idx": np.ravel_multi_index(codes, shape),
+                "tables": {},
+            }
+
+        grid = self._grid
+
+        for coef in coefs:
+            if coef not in grid["tables"]:
+                if coef not in self.df.columns:
+                    raise ValueError(f'No "{coef}" column in "{self.uid}" aeroMap!')
+                table = np.empty(np.prod(grid["shape"]))
+                table[grid["flat_idx"]] = self.df[coef].to_numpy(dtype=float)
+                grid["tables"][coef] = table.reshape(grid["shape"])
+
+        return grid["axes"], {coef: grid["tables"][coef] for coef in coefs}
+
+    def interpolate(self, alt, mach, aos, aoa, coefs=None, out_of_bounds="error"):
+        """Interpolate coefficients at any flight states with a multilinear interpolation.
+
+        The AeroMap must be a full-factorial grid of the 4 parameters. Parameters can be given
+        as floats or arrays (broadcast together), all the points are interpolated at once.
+
+        Args:
+            alt (float, np.ndarray): Altitude(s)
+            mach (float, np.ndarray): Mach number(s)
+            aos (float, np.ndarray): Angle(s) of sideslip
+            aoa (float, np.ndarray): Angle(s) of attack
+            coefs (str, list, optional): Coefficient or list of coefficients to interpolate.
+                Defaults to None, which means all coefficients (COEFS) present in the AeroMap.
+            out_of_bounds (str, optional): Behaviour for points outside of the AeroMap domain,
+                'error', 'nan', 'clip' or 'extrapolate'. Defaults to 'error'.
+
+        Returns:
+            np.ndarray if 'coefs' is a string, otherwise a dict {coef: np.ndarray}
+
+        """
+
+        if coefs is None:
+            coefs = [coef for coef in COEFS if coef in self.df.columns]
+
+        axes, tables = self._get_grid(listify(coefs))
+        interpolated = interpolate_on_grid(axes, tables, [alt, mach, aos, aoa], out_of_bounds)
+
+        if isinstance(coefs, str):
+            return interpolated[coefs]
+
+        return interpolated
+
+    def _get_triangulation(self, cache_dir=None):
+        """Get the Delaunay triangulation of the AeroMap states in the normalized parameters space.
+
+        Parameters with only one value are not part of the triangulation, the others are
+        normalized between 0 and 1. The triangulation is cached until the AeroMap is modified.
+        If 'cache_dir' is given, it is also stored in this directory as a '.npz' file named with
+        a hash of the parameters columns and loaded from there (without pickle, see
+        'load_triangulation') when it already exists and matches the AeroMap states.
+
+        Args:
+            cache_dir (str, Path, optional): Directory where triangulations are cached.
+
+        Returns:
+            dict: Triangulation and normalization data
+
+        """
+
+        from scipy.spatial import Delaunay
+
+        if self._triangulation is None or self._triangulation["version"] != self._version:
+
+            points = self.df[PARAMS].to_numpy(dtype=float)
+            p_min = points.min(axis=0)
+            p_max = points.max(axis=0)
+            dims = np.flatnonzero(p_max > p_min)
+
+            if len(dims) < 2:
+                raise ValueError(
+                    f'At least 2 parameters must vary in "{self.uid}" aeroMap for a scattered \
+                    interpolation, use "interpolate" instead!'
+                )
+
+            self._triangulation = {
+                "version": self._version,
+                "tri": None,
+                "hash": hashlib.sha256(np.ascontiguousarray(points).tobytes()).hexdigest(),
+                "dims": dims,
+                "p_min": p_min,
+                "p_max": p_max,
+            }
+
+        triangulation = self._triangulation
+
+        dims = triangulation["dims"]
+        p_min = triangulation["p_min"]
+        p_max = triangulation["p_max"]
+
+        cache_file = None
+        if cache_dir is not None:
+            cache_file = Path(cache_dir, f"triangulation_{triangulation['hash']}.npz")
+
+        write_cache = cache_file is not None and not cache_file.exists()
+
+        if triangulation["tri"] is None:
+            points = self.df[PARAMS].to_numpy(dtype=float)[:, dims]
+            points = (points - p_min[dims]) / (p_max[dims] - p_min[dims])
+
+            if cache_file is not None and not write_cache:
+                triangulation["tri"] = load_triangulation(cache_file, points)
+                # Invalid cache file, it is replaced
+                write_cache = triangulation["tri"] is None
+
+            if triangulation["tri"] is None:
+                triangulation["tri"] = Delaunay(points)
+
+        if write_cache:
+            Path(cache_dir).mkdir(parents=True, exist_ok=True)
+            save_triangulation(triangulation["tri"], cache_file)
+
+        return triangulation
+
+    def interpolate_scattered(
+        self, alt, mach, aos, aoa, coefs=None, out_of_bounds="error", cache_dir=None
+    ):
+        """Interpolate coefficients at any flight states for AeroMaps which are not structured
+        grids, with a linear interpolation on a Delaunay triangulation of the states.
+
+        Args:
+            alt (float, np.ndarray): Altitude(s)
+            mach (float, np.ndarray): Mach number(s)
+            aos (float, np.ndarray): Angle(s) of sideslip
+            aoa (float, np.ndarray): Angle(s) of attack
+            coefs (str, list, optional): Coefficient or list of coefficients to interpolate.
+                Defaults to None, which means all coefficients (COEFS) present in the AeroMap.
+            out_of_bounds (str, optional): Behaviour for points outside of the convex hull of
+                the AeroMap states, 'error', 'nan' or 'nearest'. Defaults to 'error'.
+            cache_dir (str, Path, optional): Directory to cache the triangulation on disk.
+
+        Returns:
+            np.ndarray if 'coefs' is a string, otherwise a dict {coef: np.ndarray}
+
+        """
+
+        if out_of_bounds not in SCATTERED_OUT_OF_BOUNDS_OPTIONS:
+            raise ValueError(
+                f'Invalid out_of_bounds option "{out_of_bounds}"! \
+                Must be one of the following: {", ".join(SCATTERED_OUT_OF_BOUNDS_OPTIONS)}'
+            )
+
+        if coefs is None:
+            coefs = [coef for coef in COEFS if coef in self.df.columns]
+        coef_list = listify(coefs)
+
+        for coef in coef_list:
+            if coef not in self.df.columns:
+                raise ValueError(f'No "{coef}" column in "{self.uid}" aeroMap!')
+
+        triangulation = self._get_triangulation(cache_dir)
+        dims = triangulation["dims"]
+        p_min = triangulation["p_min"]
+        p_max = triangulation["p_max"]
+
+        points = np.broadcast_arrays(*[np.asarray(x, dtype=float) for x in [alt, mach, aos, aoa]])
+        shape = points[0].shape
+        points = np.stack([x.ravel() for x in points], axis=-1)
+
+        # Points must have the same value as the AeroMap for the constant parameters
+        constant_dims = np.setdiff1d(np.arange(len(PARAMS)), dims)
+        outside = (points[:, constant_dims] != p_min[constant_dims]).any(axis=1)
+
+        normalized = (points[:, dims] - p_min[dims]) / (p_max[dims] - p_min[dims])
+        values = self.df[coef_list].to_numpy(dtype=float)
+
+        # Barycentric coordinates of the points in their simplex
+        tri = triangulation["tri"]
+        simplex = tri.find_simplex(normalized)
+        outside |= simplex < 0
+
+        transform = tri.transform[simplex]
+        bary = np.einsum("nij,nj->ni", transform[:, : len(dims)], normalized - transform[:, -1])
+        bary = np.column_stack([bary, 1 - bary.sum(axis=1)])
+        vertices = tri.simplices[simplex]
+
+        interpolated = np.column_stack(
+            [np.einsum("ni,ni->n", bary, values[vertices, i]) for i in range(len(coef_list))]
+        )
+
+        if outside.any():
+            if out_of_bounds == "error":
+                raise ValueError(
+                    f"{np.count_nonzero(outside)} point(s) are outside of the AeroMap domain! \
+                    Use another 'out_of_bounds' option to interpolate them."
+                )
+            elif out_of_bounds == "nan":
+                interpolated[outside] = np.nan
+            else:
+                from scipy.interpolate import NearestNDInterpolator
+
+                nearest = NearestNDInterpolator(tri.points, values)
+                interpolated[outside] = nearest(normalized[outside])
+
+        interpolated = {
+            coef: interpolated[:, i].reshape(shape) for i, coef in enumerate(coef_list)
+        }
+
+        if isinstance(coefs, str):
+            return interpolated[coefs]
+
+        return interpolated
 
     def add_row(
         self,
@@ -247,32 +1537,66 @@ class AeroMap:
         """
 
         # Check if the parameter already exists
-        filt = get_filter(self.df, [alt], [mach], [aos], [aoa])
-        if not self.df.loc[filt].empty:
+        index = self._get_index()
+        key = get_state_key(alt, mach, aos, aoa)
+        if key in index:
             raise ValueError(
                 f"Row with alt={alt}, mach={mach}, aos={aos}, aoa={aoa} already exists!"
             )
 
-        new_row = {
-            "altitude": alt,
-            "machNumber": mach,
-            "angleOfSideslip": aos,
-            "angleOfAttack": aoa,
-            "cd": cd,
-            "cl": cl,
-            "cs": cs,
-            "cmd": cmd,
-            "cml": cml,
-            "cms": cms,
-        }
+        # Stage the new row in the buffer (its capacity is doubled when it is full), it will be
+        # appended to the dataframe the next time 'df' is accessed
+        if self._buffer is None:
+            self._buffer = np.empty((BUFFER_MIN_SIZE, len(PARAMS_COEFS)))
+        elif self._buffer_size == len(self._buffer):
+            self._buffer = np.concatenate([self._buffer, np.empty_like(self._buffer)])
 
-        # Check if all column already exist
-        for col in new_row:
-            if col not in self.df.columns:
-                self.df[col] = np.nan
+        self._buffer[self._buffer_size] = [alt, mach, aos, aoa, cd, cl, cs, cmd, cml, cms]
+        self._buffer_size += 1
 
-        # Add the new row
-        self.df = pd.concat([self.df, pd.DataFrame([new_row])], ignore_index=True)
+        # Keep the index up to date
+        index[key] = [len(self._df) + self._buffer_size - 1]
+        self._index_size = len(self._df) + self._buffer_size
+        self._version += 1
+
+    def add_rows(self, data):
+        """Add several rows at once in an AeroMap dataframe.
+
+        Duplicated states (inside the batch or already in the AeroMap) are checked in one pass
+        and the new rows are appended in a single operation.
+
+        Args:
+            data (DataFrame, dict): States and coefficients to add, as a DataFrame or a dict of
+                arrays. Must contain the 4 parameters columns, any other column (coefficients,
+                damping derivatives) is optional.
+
+        """
+
+        batch_df = get_batch_df(data)
+        keys = list(zip(*[batch_df[param].tolist() for param in PARAMS]))
+
+        # Check for duplicated states inside the batch and in the AeroMap
+        if batch_df.duplicated(subset=PARAMS).any():
+            raise ValueError("The batch of states to add contains duplicated states!")
+
+        index = self._get_index()
+        existing = [key for key in keys if key in index]
+        if existing:
+            raise ValueError(
+                f'{len(existing)} state(s) already exist in "{self.uid}" aeroMap! \
+                (e.g. alt, mach, aos, aoa = {existing[0]})'
+            )
+
+        # Add the new rows and keep the index up to date
+        self._flush_buffer()
+        start = len(self._df)
+        self._df = get_storage_df(
+            pd.concat([self._df, batch_df], ignore_index=True), self._storage
+        )
+        for i, key in enumerate(keys):
+            index[key] = [start + i]
+        self._index_size = len(self._df)
+        self._version += 1
 
     def remove_row(self, alt, mach, aos, aoa):
         """Remove a row in an Aeromap dataframe for a set of parameters.
@@ -286,16 +1610,16 @@ class AeroMap:
         """
 
         # Check if the parameter exists
-        filt = get_filter(self.df, [alt], [mach], [aos], [aoa])
+        rows = self.get_rows(alt, mach, aos, aoa)
 
-        if filt.empty or filt.any() == False:
+        if not rows:
             raise ValueError(
                 f'No values has been found for \
                 {alt}, {mach}, {aos}, {aoa} in "{self.uid}" aeroMap!'
             )
 
-        # Remove the row
-        self.df = self.df.drop(self.df.loc[filt].index)
+        # Remove the row (following rows are shifted, the index will be rebuilt)
+        self.df = self.df.drop(self.df.index[rows])
 
     def add_coefficients(
         self,
@@ -327,15 +1651,82 @@ class AeroMap:
         """
 
         # Check if parameter are already in the dataframe
-        filt = get_filter(self.df, [alt], [mach], [aos], [aoa])
+        rows = self.get_rows(alt, mach, aos, aoa)
 
-        if filt.empty or filt.any() == False:
+        if not rows:
             raise ValueError(
                 f'No values has been found for \
                 {alt}, {mach}, {aos}, {aoa} in "{self.uid}" aeroMap!'
             )
 
-        self.df.loc[filt, ["cd", "cl", "cs", "cmd", "cml", "cms"]] = [cd, cl, cs, cmd, cml, cms]
+        # Values are written by position (index labels could be duplicated), missing
+        # coefficients columns are created
+        self._flush_buffer()
+        for col in COEFS:
+            if col not in self._df.columns:
+                self._df[col] = np.nan
+        self._own_columns(COEFS)
+        for col, value in zip(COEFS, [cd, cl, cs, cmd, cml, cms]):
+            col_pos = self._df.columns.get_loc(col)
+            self._df.iloc[rows, col_pos] = self._df[col].dtype.type(value)
+        self._apply_storage(COEFS)
+        self._version += 1
+
+    def update_coefficients(self, data, add_missing=False):
+        """Update coefficients of several existing states at once.
+
+        Only the columns given in 'data' are updated, other coefficients are not modified.
+        Damping derivatives columns (e.g. 'dampingDerivatives_positiveRates_dcsdrStar') can also
+        be updated, they are created if they don't exist yet.
+
+        Args:
+            data (DataFrame, dict): States and coefficients to update, as a DataFrame or a dict
+                of arrays. Must contain the 4 parameters columns.
+            add_missing (bool, optional): If True, states that do not exist in the AeroMap are
+                added, if False a ValueError is raised. Defaults to False.
+
+        """
+
+        batch_df = get_batch_df(data)
+        keys = list(zip(*[batch_df[param].tolist() for param in PARAMS]))
+
+        if batch_df.duplicated(subset=PARAMS).any():
+            raise ValueError("The batch of states to update contains duplicated states!")
+
+        # Find the rows corresponding to each state of the batch
+        index = self._get_index()
+        batch_rows = []
+        df_rows = []
+        missing_rows = []
+        for i, key in enumerate(keys):
+            if key in index:
+                for pos in index[key]:
+                    batch_rows.append(i)
+                    df_rows.append(pos)
+            else:
+                missing_rows.append(i)
+
+        if missing_rows and not add_missing:
+            raise ValueError(
+                f'{len(missing_rows)} state(s) have not been found in "{self.uid}" aeroMap! \
+                (e.g. alt, mach, aos, aoa = {keys[missing_rows[0]]})'
+            )
+
+        # Update coefficients column by column, values are cast to the type of the column
+        self._flush_buffer()
+        coef_cols = [col for col in batch_df.columns if col not in PARAMS]
+        for col in coef_cols:
+            if col not in self._df.columns:
+                self._df[col] = np.nan
+            self._densify(col)
+            self._own_columns([col])
+            values = batch_df[col].to_numpy()[batch_rows].astype(self._df[col].dtype)
+            self._df.iloc[df_rows, self._df.columns.get_loc(col)] = values
+        self._apply_storage(coef_cols)
+        self._version += 1
+
+        if missing_rows:
+            self.add_rows(batch_df.iloc[missing_rows])
 
     def add_damping_derivatives(self, alt, mach, aos, aoa, coef, axis, value, rate=-1.0):
         """Add a damping derivative coefficients for an existing set of alt,mach,aos,aoa.
@@ -365,35 +1756,76 @@ class AeroMap:
             raise ValueError(f'Rotation rate "{rate}" is not valid!')
 
         # Check if this set of parameters exists
-        filter = get_filter(self.df, [alt], [mach], [aos], [aoa])
-        if not filter.any():
+        rows = self.get_rows(alt, mach, aos, aoa)
+        if not rows:
             raise ValueError(
                 f"Parameters for alt={alt}, mach={mach}, aos={aos}, aoa={aoa} \
                 do not exist!"
             )
 
-        self.df.loc[
-            (self.df["altitude"] == alt)
-            & (self.df["machNumber"] == mach)
-            & (self.df["angleOfSideslip"] == aos)
-            & (self.df["angleOfAttack"] == aoa),
-            [col_name],
-        ] = value
+        self._densify(col_name)
+        self._own_columns([col_name])
+        if col_name not in self._df.columns:
+            self._df[col_name] = np.nan
+        col_pos = self._df.columns.get_loc(col_name)
+        self._df.iloc[rows, col_pos] = self._df[col_name].dtype.type(value)
+        self._apply_storage([col_name])
+        self._version += 1
 
     def plot(self, x_param, y_param, alt=None, mach=None, aos=None, aoa=None):
         """Plot 'x_param' vs 'y_param' with filtered parameters passed as float or string."""
 
-        alt_list = listify(alt)
-        mach_list = listify(mach)
-        aos_list = listify(aos)
-        aoa_list = listify(aoa)
+        from matplotlib import pyplot as plt
+
+        alt_list = get_filter_values(alt)
+        mach_list = get_filter_values(mach)
+        aos_list = get_filter_values(aos)
+        aoa_list = get_filter_values(aoa)
 
         filt = get_filter(self.df, alt_list, mach_list, aos_list, aoa_list)
         self.df.loc[filt].plot(x=x_param, y=y_param, ylabel=y_param, legend=False, marker="o")
         plt.show()
 
+    def plot_to_files(self, plots, output_dir, file_format="png", nb_proc=None):
+        """Render many plots of the AeroMap to files (see 'plot_aeromaps_to_files').
+
+        Args:
+            plots (list): List of plots given as (x_param, y_param) or
+                (x_param, y_param, filters) where filters is a dict of 'get' filters
+            output_dir (str, Path): Directory where the files are written
+            file_format (str, optional): Format of the files ("png" or "svg").
+                Defaults to "png".
+            nb_proc (int, optional): Number of processes. Defaults to None (number of CPUs).
+
+        Returns:
+            file_paths (list): Paths of the rendered files, in the same order as 'plots'
+        """
+
+        return plot_aeromaps_to_files(
+            [(self,) + tuple(plot) for plot in plots], output_dir, file_format, nb_proc
+        )
+
+    def _save_vector(self, col_name, xpath):
+        """Save a column of the dataframe as a float vector at the given xpath. Nothing is done
+        if the column has not been modified since it was loaded from or saved in TIXI."""
+
+        vector = self.df[col_name].to_numpy(dtype=float)
+        vector_hash = get_vector_hash(vector)
+
+        if self._saved_hashes.get(col_name) == vector_hash and self.tixi.checkElement(xpath):
+            return
+
+        create_branch(self.tixi, xpath)
+        add_float_vector(self.tixi, xpath, vector.tolist())
+        self._saved_hashes[col_name] = vector_hash
+
     def save(self):
-        """Save the AeroMap in the TIXI object."""
+        """Save the AeroMap in the TIXI object. Only the vectors which have been modified since
+        the AeroMap was loaded or last saved are written."""
+
+        # Restore the sparse columns of the "compact" storage, which are kept dense when they
+        # are modified
+        self._df = get_storage_df(self.df, self._storage)
 
         # Create and fill the '/aeroPerformanceMap' field
         if not self.xpath:
@@ -412,9 +1844,7 @@ class AeroMap:
         for param in PARAMS:
             if param in self.df:
                 if not self.df[param].isnull().values.any():
-                    param_xpath = self.xpath + "/" + param
-                    create_branch(self.tixi, param_xpath)
-                    add_float_vector(self.tixi, param_xpath, self.df[param].tolist())
+                    self._save_vector(param, self.xpath + "/" + param)
                 else:
                     raise ValueError(
                         "All the 4 parameters (alt,mach,aos,aoa) must not contains NaN value to \
@@ -429,9 +1859,7 @@ class AeroMap:
         for coef in COEFS:
             if coef in self.df:
                 if not self.df[coef].isnull().values.all():
-                    coef_xpath = self.xpath + "/" + coef
-                    create_branch(self.tixi, coef_xpath)
-                    add_float_vector(self.tixi, coef_xpath, self.df[coef].tolist())
+                    self._save_vector(coef, self.xpath + "/" + coef)
                 else:
                     print(
                         f'Warning: {coef} coefficient from "{self.uid}" aeroMap will not be \
@@ -445,8 +1873,7 @@ class AeroMap:
                 if col_name in self.df:
                     if not self.df[col_name].isnull().values.all():
                         coef_xpath = self.xpath + f"/dampingDerivatives/{rates}/{damping_coef}"
-                        create_branch(self.tixi, coef_xpath)
-                        add_float_vector(self.tixi, coef_xpath, self.df[col_name].tolist())
+                        self._save_vector(col_name, coef_xpath)
                     else:
                         print(
                             f'Warning: {damping_coef} coefficient from "{self.uid}" aeroMap will \
@@ -477,6 +1904,45 @@ class AeroMap:
 
         self.df.to_csv(csv_path, na_rep="NaN", index=False, float_format="%g")
 
+    def to_arrow(self):
+        """Get the AeroMap as an Apache Arrow table of float64 columns, uid, name, description
+        and atmospheric model are stored in the schema metadata.
+
+        The float64 columns stored contiguously in the dataframe are shared with the table
+        (no copy), they are copied by the AeroMap before its next in place modification.
+        Other columns (float32, sparse or not contiguous) are converted.
+        """
+
+        check_pyarrow_installed()
+        import pyarrow as pa
+
+        df = self.df
+        vectors = {col: df[col].to_numpy(dtype=float) for col in df.columns}
+        table = pa.table(vectors)
+
+        self._shared_columns |= {
+            col
+            for col, vector in vectors.items()
+            if np.shares_memory(vector, table.column(col).chunk(0).to_numpy())
+        }
+
+        return table.replace_schema_metadata(
+            {
+                "uid": self.uid,
+                "name": self.name,
+                "description": self.description,
+                "atmospheric_model": self.atmospheric_model,
+            }
+        )
+
+    def export_parquet(self, parquet_path):
+        """Export the AeroMap as a Parquet file (full precision, with its metadata)."""
+
+        check_pyarrow_installed()
+        import pyarrow.parquet as pq
+
+        pq.write_table(self.to_arrow(), str(parquet_path))
+
     def get_cd0_oswald(self, ar, alt=None, mach=None, aos=None, plot=False):
         """Calculate and return CD0 and Oswald factor."""
 
@@ -517,6 +1983,8 @@ class AeroMap:
         print("---------------------------------------------")
 
         if plot:
+            from matplotlib import pyplot as plt
+
             _, ax = plt.subplots()
             ax.plot(cl2, cd, "o")
             ax.plot(x, y, "-")
@@ -524,25 +1992,151 @@ class AeroMap:
 
         return cd0, e
 
+    def get_cd0_oswald_sweep(self, ar):
+        """Calculate CD0 and Oswald factor for all the (alt, mach, aos) conditions at once.
+
+        Same method as 'get_cd0_oswald' (linear regression of cd vs cl^2, only for cl >= 0),
+        with all the regressions calculated together and without any printing or plotting.
+        Conditions with less than 2 usable points get NaN values.
+
+        Args:
+            ar (float): Aspect ratio of the wing
+
+        Return:
+            DataFrame: One row per (alt, mach, aos) with 'cd0' and 'oswald_factor'
+
+        """
+
+        group_params = ["altitude", "machNumber", "angleOfSideslip"]
+        df = self.df
+
+        conditions, codes = np.unique(
+            df[group_params].to_numpy(dtype=float), axis=0, return_inverse=True
+        )
+        codes = codes.ravel()
+
+        # Check for unique angleOfAttack condition
+        group_aoa = np.column_stack([codes, df["angleOfAttack"].to_numpy(dtype=float)])
+        if len(np.unique(group_aoa, axis=0)) < len(group_aoa):
+            raise ValueError(
+                "You must have unique angle of attack value to calculate CD0 and Oswald factor!"
+            )
+
+        cd = df["cd"].to_numpy(dtype=float)
+        cl = df["cl"].to_numpy(dtype=float)
+
+        # Remove value when Cl < 0 (or missing values)
+        cond = (cl >= 0) & ~np.isnan(cd)
+
+        k, cd0 = linear_regression_by_group(
+            codes[cond], np.power(cl[cond], 2), cd[cond], nb_groups=len(conditions)
+        )
+
+        result = pd.DataFrame(conditions, columns=group_params)
+        result["cd0"] = cd0
+        with np.errstate(divide="ignore"):
+            result["oswald_factor"] = 1 / (k * ar * math.pi)
+
+        return result
+
+    def get_trim(self, coefs=None, method="linear"):
+        """Find the trimmed angle of attack (cms = 0) for all the (alt, mach, aos) conditions
+        at once, with the coefficients interpolated at trim.
+
+        The trim is the first change of sign of cms along the angle of attack sweep of each
+        condition. Inside this bracket, cms and the coefficients are interpolated linearly
+        ("linear") or with a cubic Hermite spline which uses the neighbouring points ("spline").
+        Conditions without any change of sign of cms get NaN values.
+
+        Args:
+            coefs (list, optional): Coefficients to interpolate at trim. Defaults to None (all
+                the coefficients of the AeroMap except cms).
+            method (str, optional): Interpolation method, one of TRIM_METHODS.
+                Defaults to "linear".
+
+        Return:
+            DataFrame: One row per (alt, mach, aos) with the trimmed angle of attack and the
+            coefficients at trim
+
+        """
+
+        if method not in TRIM_METHODS:
+            raise ValueError(f"'method' must be one of {TRIM_METHODS}, not '{method}'!")
+
+        group_params = ["altitude", "machNumber", "angleOfSideslip"]
+        df = self.df
+
+        if "cms" not in df:
+            raise ValueError(f'No "cms" coefficient in "{self.uid}" aeroMap to find the trim!')
+
+        if coefs is None:
+            coefs = [coef for coef in COEFS if coef != "cms" and coef in df]
+
+        conditions, codes = np.unique(
+            df[group_params].to_numpy(dtype=float), axis=0, return_inverse=True
+        )
+        codes = codes.ravel()
+
+        # Sort the states by condition and angle of attack
+        order = np.lexsort([df["angleOfAttack"].to_numpy(dtype=float), codes])
+        codes = codes[order]
+        aoa = df["angleOfAttack"].to_numpy(dtype=float)[order]
+        cms = df["cms"].to_numpy(dtype=float)[order]
+        values = {coef: df[coef].to_numpy(dtype=float)[order] for coef in coefs}
+
+        # First bracket [i, i+1] of each condition where cms changes sign
+        cross = (codes[:-1] == codes[1:]) & (np.sign(cms[:-1]) * np.sign(cms[1:]) <= 0)
+        brackets = np.flatnonzero(cross)
+        trim_conditions, first = np.unique(codes[brackets], return_index=True)
+        i0 = brackets[first]
+        i1 = i0 + 1
+        h = aoa[i1] - aoa[i0]
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            s = np.where(cms[i0] != cms[i1], cms[i0] / (cms[i0] - cms[i1]), 0.0)
+
+        if method == "spline":
+            cms_slopes = get_hermite_slopes(aoa, cms, codes)
+            d0, d1 = cms_slopes[i0], cms_slopes[i1]
+            for _ in range(TRIM_NEWTON_ITERATIONS):
+                f = hermite_interpolation(cms[i0], cms[i1], d0, d1, h, s)
+                df_ds = hermite_interpolation(cms[i0], cms[i1], d0, d1, h, s, derivative=True)
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    s = np.clip(np.where(df_ds != 0, s - f / df_ds, s), 0.0, 1.0)
+
+        result = pd.DataFrame(conditions, columns=group_params)
+        result["angleOfAttack"] = np.nan
+        result.loc[trim_conditions, "angleOfAttack"] = aoa[i0] + s * h
+
+        for coef, y in values.items():
+            if method == "spline":
+                slopes = get_hermite_slopes(aoa, y, codes)
+                trim_values = hermite_interpolation(y[i0], y[i1], slopes[i0], slopes[i1], h, s)
+            else:
+                trim_values = y[i0] + s * (y[i1] - y[i0])
+            result[coef] = np.nan
+            result.loc[trim_conditions, coef] = trim_values
+
+        return result
+
     def calculate_forces(self, aircraft):
         """Calculate forces and moment from coefficients"""
 
         COEF2FORCE_DICT = {"cd": "drag", "cl": "lift", "cs": "side"}
         COEF2MOMENT_DICT = {"cmd": "md", "cml": "ml", "cms": "ms"}
 
-        def coef2force(row, coef):
-            """Calculate force from coefficient"""
-
-            dens = Atmosphere(row["altitude"]).density[0]
-            sos = Atmosphere(row["altitude"]).speed_of_sound[0]
+        # Density and speed of sound are only evaluated once per unique altitude
+        dens, sos = get_atmosphere_properties(self.df["altitude"].to_numpy(dtype=float))
 
-            return 0.5 * dens * aircraft.ref_area * (row["machNumber"] * sos) ** 2 * row[coef]
+        # Dynamic pressure times reference area, common to all forces and moments. The square is
+        # computed with 'float_power' (libm 'pow', as for the float64 scalars of the row by row
+        # computation), '** 2' would compute 'x * x' which can differ by 1 ulp
+        velocity = self.df["machNumber"].to_numpy(dtype=float) * sos
+        q_ref_area = 0.5 * dens * aircraft.ref_area * np.float_power(velocity, 2)
 
         for coef in COEF2FORCE_DICT:
             if coef in self.df:
-                self.df[COEF2FORCE_DICT[coef]] = self.df.apply(
-                    lambda row: coef2force(row, coef), axis=1
-                )
+                self.df[COEF2FORCE_DICT[coef]] = q_ref_area * self.df[coef].to_numpy()
             else:
                 print(
                     f"Warning: {COEF2FORCE_DICT[coef]} will not be calculated because there is \
@@ -551,8 +2145,8 @@ class AeroMap:
 
         for coef in COEF2MOMENT_DICT:
             if coef in self.df:
-                self.df[COEF2MOMENT_DICT[coef]] = self.df.apply(
-                    lambda row: coef2force(row, coef) * aircraft.ref_length, axis=1
+                self.df[COEF2MOMENT_DICT[coef]] = (
+                    q_ref_area * self.df[coef].to_numpy() * aircraft.ref_length
                 )
             else:
                 print(
@@ -560,6 +2154,9 @@ class AeroMap:
                     no {coef} coefficient in the aeroMap!"
                 )
 
+        self._df = get_storage_df(self._df, self._storage)
+        self._version += 1
+
     def check_longitudinal_stability(self, alt=None, mach=None, aos=None):
         """Check longitudinal stability (cms vs aoa) with other parameters as filter (optional).
         The stability is checked by making a linear regression on cms vs aoa and analyzing the
@@ -576,11 +2173,13 @@ class AeroMap:
 
         """
 
+        from scipy import stats
+
         msg = ""
 
-        alt_list = listify(alt)
-        mach_list = listify(mach)
-        aos_list = listify(aos)
+        alt_list = get_filter_values(alt)
+        mach_list = get_filter_values(mach)
+        aos_list = get_filter_values(aos)
         aoa_list = []
 
         if len(alt_list) > 1 or len(mach_list) > 1 or len(aos_list) > 1:
@@ -619,11 +2218,13 @@ class AeroMap:
 
         """
 
+        from scipy import stats
+
         msg = ""
 
-        alt_list = listify(alt)
-        mach_list = listify(mach)
-        aoa_list = listify(aoa)
+        alt_list = get_filter_values(alt)
+        mach_list = get_filter_values(mach)
+        aoa_list = get_filter_values(aoa)
         aos_list = []
 
         if len(alt_list) > 1 or len(mach_list) > 1 or len(aoa_list) > 1:
@@ -663,11 +2264,13 @@ class AeroMap:
 
         """
 
+        from scipy import stats
+
         msg = ""
 
-        alt_list = listify(alt)
-        mach_list = listify(mach)
-        aoa_list = listify(aoa)
+        alt_list = get_filter_values(alt)
+        mach_list = get_filter_values(mach)
+        aoa_list = get_filter_values(aoa)
         aos_list = []
 
         if len(alt_list) > 1 or len(mach_list) > 1 or len(aoa_list) > 1:
@@ -690,6 +2293,76 @@ class AeroMap:
         else:
             return False, msg
 
+    def check_stability_sweep(self, axes=None):
+        """Check the stability for all the flight conditions of the AeroMap at once.
+
+        For each axis, the AeroMap is grouped by the 3 other parameters and the slope of the
+        linear regression of the coefficient vs the parameter (same as in the 'check_..._stability'
+        functions) is calculated for all the groups together.
+
+        Args:
+            axes (list, optional): List of axes to check among 'longitudinal', 'directional' and
+                'lateral'. Defaults to None, which means all of them.
+
+        Return:
+            DataFrame: One row per axis and flight condition, with the 4 parameters (NaN for the
+                one used for the regression), 'slope', 'stable' and 'msg'.
+
+        """
+
+        if axes is None:
+            axes = list(STABILITY_AXES)
+
+        df = self.df
+        results = []
+
+        for axis in listify(axes):
+
+            if axis not in STABILITY_AXES:
+                raise ValueError(
+                    f'{axis} is not a valid axis! \
+                    Must be one of the following: {", ".join(STABILITY_AXES)}'
+                )
+
+            param, coef, stable_sign = STABILITY_AXES[axis]
+            group_params = [p for p in PARAMS if p != param]
+
+            if coef not in df.columns:
+                raise ValueError(f'No "{coef}" column in "{self.uid}" aeroMap!')
+
+            if df.empty:
+                continue
+
+            conditions, codes = np.unique(
+                df[group_params].to_numpy(dtype=float), axis=0, return_inverse=True
+            )
+            codes = codes.ravel()
+            x = df[param].to_numpy(dtype=float)
+            y = df[coef].to_numpy(dtype=float)
+
+            # Closed-form least squares slope for each group
+            slope, _ = linear_regression_by_group(codes, x, y)
+
+            nb_unique_x = np.bincount(
+                np.unique(np.column_stack([codes, x]), axis=0)[:, 0].astype(int)
+            )
+            enough = nb_unique_x >= 2
+
+            result = pd.DataFrame(conditions, columns=group_params)
+            result[param] = np.nan
+            result.insert(0, "axis", axis)
+            result["slope"] = slope
+            result["stable"] = np.where(enough, slope * stable_sign > 0, None)
+            result["msg"] = np.where(
+                enough, np.where(slope == 0, MSG_STAB_NEUTRAL, ""), MSG_STAB_NOT_ENOUGH
+            )
+            results.append(result[["axis"] + PARAMS + ["slope", "stable", "msg"]])
+
+        if not results:
+            return pd.DataFrame(columns=["axis"] + PARAMS + ["slope", "stable", "msg"])
+
+        return pd.concat(results, ignore_index=True)
+
     def __str__(self):
 
         text_line = []
@@ -712,3 +2385,55 @@ class AeroMap:
         text_line.append("---------------------------------------------------------------------\n")
 
         return ("\n").join(text_line)
+
+
+class LazyAeroMap(AeroMap):
+    """AeroMap proxy which only knows its uid, the AeroMap (metadata, parameters and
+    coefficients) is loaded from the CPACS file the first time one of its attributes is
+    accessed or modified."""
+
+    def __init__(self, tixi: "Tixi3", uid, storage="float64"):
+        """Init lazy aeromap class
+
+        Args:
+            tixi (object): TIXI object open from a CPACS file
+            uid (str): UID of the AeroMap (must exist in the CPACS file)
+            storage (str, optional): Storage policy of the dataframe once loaded, one of
+                                     STORAGE_OPTIONS. Defaults to "float64".
+        """
+
+        if storage not in STORAGE_OPTIONS:
+            raise ValueError(f"'storage' must be one of {STORAGE_OPTIONS}, not '{storage}'!")
+
+        self.__dict__["tixi"] = tixi
+        self.__dict__["uid"] = uid
+        self.__dict__["_storage"] = storage
+        self.__dict__["_loaded"] = False
+
+    @property
+    def is_loaded(self):
+        """True if the AeroMap has already been loaded from the CPACS file."""
+        return self.__dict__["_loaded"]
+
+    def _load(self):
+        """Load the AeroMap from the CPACS file."""
+
+        self.__dict__["_loaded"] = True
+        try:
+            AeroMap.__init__(self, self.tixi, self.uid, storage=self._storage)
+        except Exception:
+            self.__dict__["_loaded"] = False
+            raise
+
+    def __getattr__(self, name):
+        # Only called for attributes which are not found, i.e. not loaded yet
+        if name.startswith("__") or self.__dict__.get("_loaded", True):
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
+        self._load()
+        return getattr(self, name)
+
+    def __setattr__(self, name, value):
+        if not self.__dict__["_loaded"]:
+            self._load()
+        super().__setattr__(name, value)
@@ -22,29 +22,18 @@ Author: Aidan Jungo
 
 """
 
+import importlib.util
+import warnings
 from pathlib import Path
 
 import numpy as np
 
 from cpacspy.utils import AIRCRAFT_XPATH, ROTORCRAFT_XPATH
 
-try:
-    from tixi3 import tixi3wrapper
-    from tixi3.tixi3wrapper import Tixi3Exception
-except ImportError:
-    TIXI_INSTALLED = False
-else:
-    TIXI_INSTALLED = True
-
-try:
-    import tigl3.configuration
-    from tigl3 import tigl3wrapper
-
-    # from tigl3.tigl3wrapper import Tigl3Exception
-except ImportError:
-    TIGL_INSTALLED = False
-else:
-    TIGL_INSTALLED = True
+# TIXI and TiGL are only imported in the functions which use them, to keep 'import cpacspy'
+# fast (TiGL loads the whole geometry kernel)
+TIXI_INSTALLED = importlib.util.find_spec("tixi3") is not None
+TIGL_INSTALLED = importlib.util.find_spec("tigl3") is not None
 
 
 def open_tixi(cpacs_path):
@@ -69,6 +58,8 @@ def open_tixi(cpacs_path):
         print(err_msg)
         raise ModuleNotFoundError(err_msg)
 
+    from tixi3 import tixi3wrapper
+
     # To accept either a Path or a string
     if isinstance(cpacs_path, Path):
         cpacs_path = str(cpacs_path)
@@ -104,6 +95,8 @@ def open_tigl(tixi_handle, rotorcraft=False):
         print(err_msg)
         raise ModuleNotFoundError(err_msg)
 
+    from tigl3 import tigl3wrapper
+
     # Get model uid to open TiGL handle (in case there is also a rotorcraft in the CPACS file)
     if rotorcraft:
         model_xpath = ROTORCRAFT_XPATH
@@ -126,6 +119,8 @@ def open_tigl(tixi_handle, rotorcraft=False):
 def get_tigl_configuration(tigl):
     """Get the TiGL aircraft configuration manager."""
 
+    import tigl3.configuration
+
     # Get the configuration manager
     mgr = tigl3.configuration.CCPACSConfigurationManager_get_instance()
     aircraft = mgr.get_configuration(tigl._handle.value)
@@ -152,6 +147,8 @@ def copy_branch(tixi, xpath_from, xpath_to):
         tixi (handles): Modified TIXI Handle (with copied branch)
     """
 
+    from tixi3.tixi3wrapper import Tixi3Exception
+
     if not tixi.checkElement(xpath_from):
         raise ValueError(xpath_from + " XPath does not exist!")
     if not tixi.checkElement(xpath_to):
@@ -394,13 +391,15 @@ def get_value_or_default(tixi, xpath, default_value):
     return value
 
 
-def get_float_vector(tixi, xpath):
+def get_float_vector(tixi, xpath, as_array=False):
     """Get a vector (composed by float) at the
     given XPath, if the node does not exist, an error will be raised.
 
     Args:
         tixi (handle): Tixi handle
         xpath (str): XPath of the vector to get
+        as_array (bool, optional): If True, return the vector as a float64 numpy array
+                                   instead of a list. Defaults to False.
     """
 
     if not tixi.checkElement(xpath):
@@ -414,12 +413,26 @@ def get_float_vector(tixi, xpath):
     if float_vector_str.endswith(";"):
         float_vector_str = float_vector_str[:-1]
 
-    float_vector_list = float_vector_str.split(";")
-    float_vector = [
-        np.nan if elem in ("nan", "NaN") else float(elem) for elem in float_vector_list
-    ]
-
-    return float_vector
+    # Fast path, the whole string is parsed at once by numpy ('nan' and 'NaN' are supported)
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", DeprecationWarning)
+        try:
+            float_vector = np.fromstring(float_vector_str, dtype=float, sep=";")
+        except (DeprecationWarning, ValueError):
+            float_vector = None
+
+    # Fallback if the string could not be parsed entirely (raise error for invalid values)
+    if float_vector is None or float_vector.size != float_vector_str.count(";") + 1:
+        float_vector_list = float_vector_str.split(";")
+        float_vector = np.array(
+            [np.nan if elem in ("nan", "NaN") else float(elem) for elem in float_vector_list],
+            dtype=float,
+        )
+
+    if as_array:
+        return float_vector
+
+    return float_vector.tolist()
 
 
 def add_float_vector(tixi, xpath, vector):
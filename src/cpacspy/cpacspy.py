@@ -22,22 +22,70 @@ Author: Aidan Jungo
 
 """
 
+import re
 from pathlib import Path
 
 import numpy as np
 import pandas as pd
 
-from cpacspy.aeromap import AeroMap
+from cpacspy.aeromap import (
+    AeroMap,
+    LazyAeroMap,
+    check_pyarrow_installed,
+    get_duplicated_rows,
+    get_state_hashes,
+)
 from cpacspy.aircraft import Aircraft
 from cpacspy.cpacsfunctions import get_xpath_parent, open_tigl, open_tixi
 from cpacspy.rotorcraft import Rotorcraft
-from cpacspy.utils import AC_NAME_XPATH, AEROPERFORMANCE_XPATH, AIRCRAFT_XPATH, ROTORCRAFT_XPATH
+from cpacspy.utils import (
+    AC_NAME_XPATH,
+    AEROPERFORMANCE_XPATH,
+    AIRCRAFT_XPATH,
+    PARAMS,
+    ROTORCRAFT_XPATH,
+    count_lines,
+)
+
+
+# Match the "aeroMap" element (and its index) of an aeroMap xpath
+AEROMAP_XPATH_PATTERN = re.compile(r"/aeroMap(?:\[(\d+)\])?(?=/|$)")
+
+
+def get_aeromap_xpath_index(xpath):
+    """Get the index of the "aeroMap" element of an aeroMap xpath (1 if there is no index)."""
+
+    match = AEROMAP_XPATH_PATTERN.search(xpath)
+    if match is None:
+        raise ValueError(f"{xpath} is not the xpath of an aeroMap!")
+
+    return int(match.group(1) or 1)
 
 
 class CPACS:
     """CPACS class"""
 
-    def __init__(self, cpacs_file):
+    def __init__(
+        self, cpacs_file, lazy_aeromaps=False, aeromap_storage="float64", lazy_geometry=False
+    ):
+        """Init CPACS class
+
+        Args:
+            cpacs_file (str, Path): Path to the CPACS file
+            lazy_aeromaps (bool, optional): If True, aeroMaps are only loaded from the CPACS
+                                            file when they are accessed for the first time.
+                                            Defaults to False.
+            aeromap_storage (str, optional): Storage policy of the aeroMaps dataframes
+                                             ("float64", "float32" or "compact").
+                                             Defaults to "float64".
+            lazy_geometry (bool, optional): If True, TiGL is only opened and the aircraft and
+                                            rotorcraft are only created when they are
+                                            accessed for the first time. Useful when only
+                                            aeroMaps are used. Defaults to False.
+        """
+
+        self.lazy_aeromaps = lazy_aeromaps
+        self.aeromap_storage = aeromap_storage
 
         # To accept either a Path or a string
         if isinstance(cpacs_file, Path):
@@ -47,37 +95,98 @@ class CPACS:
 
         # CPACS
         self.tixi = open_tixi(cpacs_file)
-        self.tigl = open_tigl(self.tixi)
+        self._tigl = None
+        self._tigl_rotor = None
+        self._aircraft = None
+        self._rotorcraft = None
 
         # Aircraft name
         if self.tixi.checkElement(AC_NAME_XPATH):
             self.ac_name = self.tixi.getTextElement(AC_NAME_XPATH)
 
-        # Aircraft data
-        if self.tixi.checkElement(AIRCRAFT_XPATH):
-            self.aircraft = Aircraft(self.tixi, self.tigl)
+        # TiGL, aircraft and rotorcraft data (created at their first access with lazy_geometry)
+        if not lazy_geometry:
+            self._tigl = open_tigl(self.tixi)
 
-        # Rotorcraft data
-        if self.tixi.checkElement(ROTORCRAFT_XPATH):
-            self.tigl_rotor = open_tigl(self.tixi, rotorcraft=True)
-            self.rotorcraft = Rotorcraft(self.tixi, self.tigl_rotor)
+            if self.tixi.checkElement(AIRCRAFT_XPATH):
+                self._aircraft = Aircraft(self.tixi, self._tigl)
+
+            if self.tixi.checkElement(ROTORCRAFT_XPATH):
+                self._tigl_rotor = open_tigl(self.tixi, rotorcraft=True)
+                self._rotorcraft = Rotorcraft(self.tixi, self._tigl_rotor)
 
         # Load aeroMaps
         self.load_all_aeromaps()
 
+    @property
+    def tigl(self):
+        """TIGL object open from the CPACS file (opened at the first access)."""
+
+        if self._tigl is None:
+            self._tigl = open_tigl(self.tixi)
+        return self._tigl
+
+    @property
+    def aircraft(self):
+        """Aircraft object (created at the first access), only if the CPACS file contains an
+        aircraft."""
+
+        if self._aircraft is None:
+            if not self.tixi.checkElement(AIRCRAFT_XPATH):
+                raise AttributeError(f"No aircraft has been found in {self.cpacs_file}!")
+            self._aircraft = Aircraft(self.tixi, self.tigl)
+        return self._aircraft
+
+    @property
+    def tigl_rotor(self):
+        """TIGL object open for the rotorcraft of the CPACS file (opened at the first access)."""
+
+        if self._tigl_rotor is None:
+            if not self.tixi.checkElement(ROTORCRAFT_XPATH):
+                raise AttributeError(f"No rotorcraft has been found in {self.cpacs_file}!")
+            self._tigl_rotor = open_tigl(self.tixi, rotorcraft=True)
+        return self._tigl_rotor
+
+    @property
+    def rotorcraft(self):
+        """Rotorcraft object (created at the first access), only if the CPACS file contains a
+        rotorcraft."""
+
+        if self._rotorcraft is None:
+            self._rotorcraft = Rotorcraft(self.tixi, self.tigl_rotor)
+        return self._rotorcraft
+
+    @property
+    def aeromaps(self):
+        """List of the aeromap objects, in the order of the registry."""
+        return list(self._aeromaps.values())
+
+    @property
+    def nb_aeromaps(self):
+        """Number of aeromap objects in the registry."""
+        return len(self._aeromaps)
+
     def load_all_aeromaps(self):
-        """Load all the aeromaps present in the CPACS file as object."""
+        """Load all the aeromaps present in the CPACS file as object. They are stored in the
+        registry {uid: aeromap} which is then kept in sync with the CPACS file by the methods
+        which create, duplicate or delete aeromaps."""
 
-        self.nb_aeromaps = 0
-        self.aeromaps = []
+        self._aeromaps = {}
 
-        for aeromap_uid in self.get_aeromap_uid_list():
-            aeromap = AeroMap(self.tixi, aeromap_uid)
-            self.aeromaps.append(aeromap)
-            self.nb_aeromaps += 1
+        for aeromap_uid in self._get_aeromap_uid_list_from_tixi():
+            if self.lazy_aeromaps:
+                aeromap = LazyAeroMap(self.tixi, aeromap_uid, storage=self.aeromap_storage)
+            else:
+                aeromap = AeroMap(self.tixi, aeromap_uid, storage=self.aeromap_storage)
+            self._aeromaps[aeromap_uid] = aeromap
 
     def get_aeromap_uid_list(self):
-        """Get the list of all aeroMap UID."""
+        """Get the list of all aeroMap UID (from the registry, no access to the CPACS file)."""
+
+        return list(self._aeromaps)
+
+    def _get_aeromap_uid_list_from_tixi(self):
+        """Get the list of all aeroMap UID present in the CPACS file."""
 
         uid_list = []
 
@@ -98,11 +207,10 @@ class CPACS:
     def get_aeromap_by_uid(self, uid):
         """Get an aeromap object by its uid."""
 
-        for aeromap in self.aeromaps:
-            if aeromap.uid == uid:
-                return aeromap
+        if uid not in self._aeromaps:
+            raise ValueError(f'No aeromap with "{uid}" as uid as been found!')
 
-        raise ValueError(f'No aeromap with "{uid}" as uid as been found!')
+        return self._aeromaps[uid]
 
     def create_aeromap(self, uid):
         """Create a new aeromap object."""
@@ -110,16 +218,30 @@ class CPACS:
         if " " in uid:
             raise ValueError("AeroMap uid should not contain any space!")
 
-        if uid not in self.get_aeromap_uid_list():
-            new_aeromap = AeroMap(self.tixi, uid, create_new=True)
-            self.aeromaps.append(new_aeromap)
-            self.nb_aeromaps += 1
+        if uid not in self._aeromaps:
+            new_aeromap = AeroMap(self.tixi, uid, create_new=True, storage=self.aeromap_storage)
+            self._aeromaps[uid] = new_aeromap
             return new_aeromap
         else:
             raise ValueError("This uid already exit!")
 
-    def create_aeromap_from_csv(self, csv_path, uid=None):
-        """Create a new aeromap object from a CSV file."""
+    def create_aeromap_from_csv(
+        self, csv_path, uid=None, chunksize=None, coef_dtype=float, progress=False
+    ):
+        """Create a new aeromap object from a CSV file.
+
+        Args:
+            csv_path (str, Path): Path to the CSV file
+            uid (str, optional): uid of the new aeroMap. Defaults to None (CSV file name).
+            chunksize (int, optional): If given, the CSV file is streamed by chunks of this
+                number of rows into columns allocated only once (no copy of the whole data).
+                Defaults to None (whole file read at once).
+            coef_dtype (type, optional): Type used to store the coefficients (e.g. np.float32),
+                parameters are always stored as float64. Defaults to float.
+            progress (bool, callable, optional): Only with 'chunksize', if True the number of
+                rows read is printed after each chunk, if callable it is called with this number.
+                Defaults to False.
+        """
 
         if isinstance(csv_path, str):
             csv_path = Path(csv_path)
@@ -130,34 +252,144 @@ class CPACS:
         if not csv_path.exists():
             raise ValueError(f"CSV file not found at {csv_path.absolute}")
 
+        columns = pd.read_csv(csv_path, nrows=0).columns
+        dtype = {col: float if col in PARAMS else coef_dtype for col in columns}
+
+        if not chunksize:
+            new_aeromap = self.create_aeromap(uid)
+            new_aeromap.df = pd.read_csv(
+                csv_path, keep_default_na=True, na_values=float(np.nan), dtype=dtype
+            )
+            return new_aeromap
+
+        missing_params = [param for param in PARAMS if param not in columns]
+        if missing_params:
+            raise ValueError(f"Missing parameter(s) {missing_params} in {csv_path}!")
+
+        if uid in self._aeromaps:
+            raise ValueError("This uid already exit!")
+
+        # Columns are filled chunk by chunk in arrays allocated once, with a capacity of the
+        # number of lines of the file. States are checked for duplicates with their hashes.
+        capacity = count_lines(csv_path)
+        arrays = {col: np.empty(capacity, dtype=dtype[col]) for col in columns}
+        hashes = np.empty(capacity, dtype=np.uint64)
+        nb_rows = 0
+
+        with pd.read_csv(
+            csv_path,
+            keep_default_na=True,
+            na_values=float(np.nan),
+            dtype=dtype,
+            chunksize=chunksize,
+        ) as reader:
+            for chunk in reader:
+
+                if chunk[PARAMS].isnull().values.any():
+                    raise ValueError(
+                        f"NaN value found in the parameters (alt,mach,aos,aoa) of {csv_path} \
+                        between rows {nb_rows} and {nb_rows + len(chunk)}!"
+                    )
+
+                end = nb_rows + len(chunk)
+                if end > capacity:
+                    capacity = max(end, 2 * capacity)
+                    arrays = {col: np.resize(arrays[col], capacity) for col in columns}
+                    hashes = np.resize(hashes, capacity)
+
+                for col in columns:
+                    arrays[col][nb_rows:end] = chunk[col].to_numpy()
+                hashes[nb_rows:end] = get_state_hashes(chunk)
+                nb_rows = end
+
+                if callable(progress):
+                    progress(nb_rows)
+                elif progress:
+                    print(f"{nb_rows} rows read from {csv_path}")
+
+        df = pd.DataFrame({col: arrays[col][:nb_rows] for col in columns}, copy=False)
+
+        duplicated_rows = get_duplicated_rows(df, hashes[:nb_rows])
+        if len(duplicated_rows):
+            raise ValueError(
+                f"Duplicated state found in {csv_path} at row {duplicated_rows[0]} \
+                (alt, mach, aos, aoa = {df[PARAMS].iloc[duplicated_rows[0]].tolist()})!"
+            )
+
         new_aeromap = self.create_aeromap(uid)
+        new_aeromap.df = df
 
-        new_aeromap.df = pd.read_csv(
-            csv_path, keep_default_na=True, na_values=float(np.nan), dtype=float
-        )
+        return new_aeromap
+
+    def create_aeromap_from_arrow(self, table, uid=None):
+        """Create a new aeromap object from an Apache Arrow table (e.g. from 'AeroMap.to_arrow').
+
+        If not given, the uid is taken from the table metadata, as well as the name,
+        description and atmospheric model if they are present. float64 columns without null
+        values are used without copy, they are copied by the AeroMap before being modified.
+        """
+
+        check_pyarrow_installed()
+
+        metadata = {
+            key.decode(): value.decode() for key, value in (table.schema.metadata or {}).items()
+        }
+
+        if not uid:
+            uid = metadata.get("uid")
+
+        if not uid:
+            raise ValueError("No uid has been given or found in the Arrow table metadata!")
+
+        new_aeromap = self.create_aeromap(uid)
+        new_aeromap.name = metadata.get("name", uid)
+        new_aeromap.description = metadata.get("description", "")
+        new_aeromap.atmospheric_model = metadata.get("atmospheric_model", "ISA")
+
+        new_aeromap.df_from_arrow(table)
 
         return new_aeromap
 
+    def create_aeromap_from_parquet(self, parquet_path, uid=None):
+        """Create a new aeromap object from a Parquet file (e.g. from 'AeroMap.export_parquet')."""
+
+        check_pyarrow_installed()
+        import pyarrow.parquet as pq
+
+        if isinstance(parquet_path, str):
+            parquet_path = Path(parquet_path)
+
+        if not parquet_path.exists():
+            raise ValueError(f"Parquet file not found at {parquet_path.absolute}")
+
+        table = pq.read_table(str(parquet_path))
+
+        if not uid and not (table.schema.metadata or {}).get(b"uid"):
+            uid = parquet_path.stem
+
+        return self.create_aeromap_from_arrow(table, uid)
+
     def duplicate_aeromap(self, uid_base, uid_duplicate):
         """Duplicate an aeromap and return the new aeromap object."""
 
         # Check uid's
-        if uid_base not in self.get_aeromap_uid_list():
+        if uid_base not in self._aeromaps:
             raise ValueError("The AeroMap to duplicate does not exit!")
 
-        if uid_duplicate in self.get_aeromap_uid_list():
+        if uid_duplicate in self._aeromaps:
             raise ValueError("This uid for the duplicate already exit!")
 
         # Get AeroMap and duplicate
         am_base = self.get_aeromap_by_uid(uid_base)
-        am_duplicated = AeroMap(self.tixi, uid_duplicate, create_new=True)
+        am_duplicated = AeroMap(
+            self.tixi, uid_duplicate, create_new=True, storage=self.aeromap_storage
+        )
 
-        # Copy data
-        am_duplicated.df = am_base.df
+        # Copy data (columns are only copied when one of the aeromaps modifies them)
+        am_duplicated.copy_df_from(am_base)
         am_duplicated.description = am_base.description + f' (duplicate from "{uid_base}")'
 
-        self.aeromaps.append(am_duplicated)
-        self.nb_aeromaps += 1
+        self._aeromaps[uid_duplicate] = am_duplicated
 
         return am_duplicated
 
@@ -168,16 +400,35 @@ class CPACS:
         if " " in uid:
             raise ValueError("AeroMap uid should not contain any space!")
 
-        if uid not in self.get_aeromap_uid_list():
+        if uid not in self._aeromaps:
             raise ValueError(f'uid "{uid}"" does not exit! The aeroMap cannot be deleted!')
 
-        # Remove the aeromap  from the CPACS file
-        aeromap = self.get_aeromap_by_uid(uid)
-        xpath = get_xpath_parent(aeromap.xpath, level=1)
+        # Remove the aeromap from the CPACS file (if it has already been saved in it)
+        aeromap = self._aeromaps.pop(uid)
+        if isinstance(aeromap, LazyAeroMap) and not aeromap.is_loaded:
+            xpath = self.tixi.uIDGetXPath(uid)
+        elif aeromap.xpath is not None:
+            xpath = get_xpath_parent(aeromap.xpath, level=1)
+            aeromap.xpath = None
+        else:
+            return
+
         self.tixi.removeElement(xpath)
 
-        # Reload the aeromaps to take into account the changes in the CPACS file
-        self.load_all_aeromaps()
+        # Shift the xpaths of the following aeromaps instead of reloading all of them, so
+        # modifications which have not been saved yet are kept
+        deleted_idx = get_aeromap_xpath_index(xpath)
+        for other in self._aeromaps.values():
+            if isinstance(other, LazyAeroMap) and not other.is_loaded:
+                continue  # Its xpath will be found when it is loaded
+            if other.xpath is None:
+                continue
+
+            other_idx = get_aeromap_xpath_index(other.xpath)
+            if other_idx > deleted_idx:
+                other.xpath = AEROMAP_XPATH_PATTERN.sub(
+                    f"/aeroMap[{other_idx - 1}]", other.xpath, count=1
+                )
 
     def save_cpacs(self, cpacs_file, overwrite=False):
         """Save a CPACS file from the TIXI object at a chosen path."""
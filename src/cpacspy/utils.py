@@ -81,3 +81,14 @@ def listify(value):
         value = []
 
     return value
+
+
+def count_lines(file_path, block_size=1 << 20):
+    """Count the number of lines of a text file, without loading the whole file in memory."""
+
+    nb_lines = 0
+    with open(file_path, "rb") as f:
+        while block := f.read(block_size):
+            nb_lines += block.count(b"\n")
+
+    return nb_lines
@@ -22,7 +22,11 @@ Author: Aidan Jungo
 
 """
 
+import pickle
+import warnings
+
 import numpy as np
+import pandas as pd
 from pathlib import Path
 
 import pytest
@@ -32,8 +36,20 @@ from unittest.mock import patch
 # from tixi3.tixi3wrapper import Tixi3Exception
 # from tigl3.tigl3wrapper import Tigl3Exception
 
+from ambiance import Atmosphere
+
+from cpacspy.aeromap import (
+    ATMOSPHERE_CACHE,
+    GET_CACHE_SIZE,
+    get_atmosphere_properties,
+    get_filter,
+    get_owned_nbytes,
+    load_triangulation,
+    plot_aeromaps_to_files,
+)
+from cpacspy.cpacsfunctions import get_float_vector
 from cpacspy.cpacspy import CPACS, AeroMap
-from cpacspy.utils import D150_TESTS_PATH, TESTS_PATH
+from cpacspy.utils import D150_TESTS_PATH, PARAMS, TESTS_PATH
 
 from src.cpacspy.utils import MSG_STAB_NEUTRAL, MSG_STAB_NOT_ENOUGH, MSG_STAB_ONE_PARAM
 
@@ -97,6 +113,242 @@ def test_get():
     assert aeromap_2.get("cd", aoa=2.0, aos=0.0) == np.array([0.13])
 
 
+def test_get_range_and_tolerance():
+    """Test 'get' and 'get_filter' with ranges and tolerances on the parameters."""
+
+    cpacs = CPACS(D150_TESTS_PATH)
+    aeromap_2 = cpacs.get_aeromap_by_uid("aeromap_test2")
+
+    # Ranges (bounds included, None for no limit)
+    np.testing.assert_array_equal(
+        aeromap_2.get("cl", mach=(0.3, 0.4)), [0.7777, 0.8888, 0.9999, 1.111]
+    )
+    np.testing.assert_array_equal(aeromap_2.get("cl", aoa=(None, 2.0)), [0.6666, 0.7777, 1.111])
+    np.testing.assert_array_equal(
+        aeromap_2.get("cl", alt=0.0, aoa=[0.0, (3.0, None)]), [0.6666, 0.8888]
+    )
+    assert aeromap_2.get("cl", mach=(0.5, 0.8)).size == 0
+
+    # Tolerances
+    assert aeromap_2.get("cl", mach=0.30000000001).size == 0
+    np.testing.assert_array_equal(
+        aeromap_2.get("cl", mach=0.30000000001, atol=1e-9), [0.7777, 0.8888, 0.9999]
+    )
+    np.testing.assert_array_equal(
+        aeromap_2.get("cl", alt=0.0, mach=0.3, aos=0.0, aoa=2.0001, rtol=1e-4), [0.7777]
+    )
+
+    with pytest.raises(ValueError):
+        aeromap_2.get("cl", mach=0.3, atol=-1.0)
+
+    with pytest.raises(ValueError):
+        aeromap_2.get("cl", mach=(0.3, 0.4, 0.5))
+
+    # Array-likes of values
+    np.testing.assert_array_equal(
+        aeromap_2.get("cl", aoa=np.array([2.0, 6.0])), [0.7777, 0.9999, 1.111]
+    )
+    np.testing.assert_array_equal(
+        aeromap_2.get("cl", mach=pd.Series([0.3]), aoa=np.array([4.0])), [0.8888]
+    )
+    assert aeromap_2.get("cl", aoa=np.array([])).size == 5
+    assert aeromap_2.get("cl", aoa=np.float64(4.0)) == [0.8888]
+    assert aeromap_2.check_longitudinal_stability(
+        mach=np.array([0.3])
+    ) == aeromap_2.check_longitudinal_stability(mach=[0.3])
+
+    with pytest.raises(ValueError):
+        aeromap_2.get("cl", aoa=np.zeros((2, 2)))
+
+    # Same rows as the dataframe filter
+    filt = get_filter(aeromap_2.df, [], [(0.25, 0.35)], [], [4.0, 6.0001], atol=1e-3)
+    np.testing.assert_array_equal(filt.to_numpy(), [False, False, True, True, False])
+    np.testing.assert_array_equal(
+        aeromap_2.get_filtered_rows(mach=(0.25, 0.35), aoa=[4.0, 6.0001], atol=1e-3), [2, 3]
+    )
+
+    # Sorted indexes are updated when the AeroMap is modified
+    aeromap_2.add_row(alt=0.0, mach=0.35, aos=0.0, aoa=0.0, cl=0.5)
+    np.testing.assert_array_equal(aeromap_2.get("cl", mach=(0.3, 0.4), aoa=0.0), [0.5])
+
+
+def test_get_multiple_columns():
+    """Test 'get' with a list of columns (2-D and structured arrays)."""
+
+    cpacs = CPACS(D150_TESTS_PATH)
+    aeromap_2 = cpacs.get_aeromap_by_uid("aeromap_test2")
+
+    cl_aoa = aeromap_2.get(["cl", "angleOfAttack"], mach=0.3)
+    assert cl_aoa.shape == (3, 2)
+    np.testing.assert_array_equal(cl_aoa[:, 0], aeromap_2.get("cl", mach=0.3))
+    np.testing.assert_array_equal(cl_aoa[:, 1], [2.0, 4.0, 6.0])
+
+    # Non contiguous rows
+    cl_aoa = aeromap_2.get(["cl", "angleOfAttack"], aoa=2.0)
+    np.testing.assert_array_equal(cl_aoa, [[0.7777, 2.0], [1.111, 2.0]])
+
+    polar = aeromap_2.get(["cl", "angleOfAttack"], mach=0.3, structured=True)
+    assert polar.dtype.names == ("cl", "angleOfAttack")
+    np.testing.assert_array_equal(polar["angleOfAttack"], [2.0, 4.0, 6.0])
+
+    assert aeromap_2.get(["cl", "cd"], mach=0.9).shape == (0, 2)
+
+    # A single column with contiguous rows is a view of the dataframe data
+    cl = aeromap_2.get("cl", mach=0.3)
+    assert np.shares_memory(cl, aeromap_2.df["cl"].to_numpy())
+
+
+def test_get_view_not_modified():
+    """Test that the views returned by 'get' are not modified by the AeroMap methods."""
+
+    cpacs = CPACS(D150_TESTS_PATH)
+    aeromap_2 = cpacs.get_aeromap_by_uid("aeromap_test2")
+    damping_col = "dampingDerivatives_negativeRates_dcldpStar"
+    aeromap_2.add_damping_derivatives(
+        alt=0.0, mach=0.3, aos=0.0, aoa=4.0, coef="cl", axis="dp", value=0.1
+    )
+
+    cl = aeromap_2.get("cl", mach=0.3)
+    cd = aeromap_2.get("cd", mach=0.3)
+    damping = aeromap_2.get(damping_col, mach=0.3)
+    assert np.shares_memory(cl, aeromap_2.df["cl"].to_numpy())
+    expected = [cl.copy(), cd.copy(), damping.copy()]
+
+    aeromap_2.add_coefficients(alt=0.0, mach=0.3, aos=0.0, aoa=2.0, cl=5.0)
+    aeromap_2.update_coefficients(
+        {
+            "altitude": [0.0],
+            "machNumber": [0.3],
+            "angleOfSideslip": [0.0],
+            "angleOfAttack": [4.0],
+            "cd": [5.0],
+        }
+    )
+    aeromap_2.add_damping_derivatives(
+        alt=0.0, mach=0.3, aos=0.0, aoa=2.0, coef="cl", axis="dp", value=5.0
+    )
+
+    for vector, values in zip([cl, cd, damping], expected):
+        np.testing.assert_array_equal(vector, values)
+
+    assert aeromap_2.get("cl", mach=0.3)[0] == 5.0
+    assert aeromap_2.get("cd", mach=0.3)[1] == 5.0
+    assert aeromap_2.get(damping_col, mach=0.3)[0] == 5.0
+
+
+def test_iter_polars():
+    """Test the iteration over the polars of an AeroMap."""
+
+    cpacs = CPACS(D150_TESTS_PATH)
+    aeromap = cpacs.get_aeromap_by_uid("extended_aeromap")
+
+    polars = list(aeromap.iter_polars(columns=["angleOfAttack", "cl"]))
+    assert len(polars) == 12
+
+    for (alt, mach, aos), polar in polars:
+        assert polar.dtype.names == ("angleOfAttack", "cl")
+        assert not polar.flags.writeable
+        np.testing.assert_array_equal(polar["angleOfAttack"], np.arange(-6.0, 10.0, 2.0))
+        np.testing.assert_array_equal(
+            polar["cl"],
+            aeromap.get("cl", alt=alt, mach=mach, aos=aos, aoa=polar["angleOfAttack"].tolist()),
+        )
+
+    # Polars are views of the same sorted array
+    assert np.shares_memory(polars[0][1], polars[-1][1].base)
+
+    # Sideslip sweeps
+    aeromap_2 = cpacs.get_aeromap_by_uid("aeromap_test2")
+    polars = dict(aeromap_2.iter_polars(by=["altitude", "machNumber", "angleOfAttack"]))
+    assert list(polars) == [
+        (0.0, 0.2, 0.0),
+        (0.0, 0.3, 2.0),
+        (0.0, 0.3, 4.0),
+        (11000.0, 0.3, 6.0),
+        (11000.0, 0.4, 2.0),
+    ]
+    assert polars[(11000.0, 0.4, 2.0)]["angleOfSideslip"] == [2.0]
+
+    with pytest.raises(ValueError):
+        list(aeromap_2.iter_polars(by="cl"))
+
+
+def test_get_cache():
+    """Test that results of 'get' are cached and invalidated when the AeroMap is modified."""
+
+    cpacs = CPACS(D150_TESTS_PATH)
+    aeromap_2 = cpacs.get_aeromap_by_uid("aeromap_test2")
+
+    cl = aeromap_2.get("cl", mach=0.3)
+    assert aeromap_2.get("cl", mach=[0.3]) is cl
+    assert not cl.flags.writeable
+    with pytest.raises(ValueError):
+        cl[0] = 0.0
+
+    aeromap_2.add_coefficients(alt=0.0, mach=0.3, aos=0.0, aoa=2.0, cl=0.5)
+    np.testing.assert_array_equal(aeromap_2.get("cl", mach=0.3), [0.5, 0.8888, 0.9999])
+
+    aeromap_2.add_row(alt=0.0, mach=0.3, aos=0.0, aoa=8.0, cl=1.2)
+    np.testing.assert_array_equal(aeromap_2.get("cl", mach=0.3), [0.5, 0.8888, 0.9999, 1.2])
+
+    aeromap_2.remove_row(alt=0.0, mach=0.3, aos=0.0, aoa=8.0)
+    np.testing.assert_array_equal(aeromap_2.get("cl", mach=0.3), [0.5, 0.8888, 0.9999])
+
+    aeromap_2.add_damping_derivatives(
+        alt=0.0, mach=0.3, aos=0.0, aoa=2.0, coef="cl", axis="dp", value=0.1
+    )
+    assert aeromap_2.get("dampingDerivatives_negativeRates_dcldpStar", mach=0.3)[0] == 0.1
+
+    aeromap_2.df = aeromap_2.df.iloc[:2]
+    np.testing.assert_array_equal(aeromap_2.get("cl", mach=0.3), [0.5])
+
+    # The cache is bounded
+    for aoa in range(GET_CACHE_SIZE + 10):
+        aeromap_2.get("cl", aoa=float(aoa))
+    assert len(aeromap_2._get_cache) == GET_CACHE_SIZE
+
+    # The memory kept alive by the cache is bounded for all the storage policies (views of the
+    # dataframe are not counted), too large results are not cached
+    nb_rows = 10_000
+    damping_col = "dampingDerivatives_negativeRates_dcldpStar"
+    for storage in ["float64", "float32", "compact"]:
+        cpacs = CPACS(D150_TESTS_PATH, aeromap_storage=storage)
+        aeromap = cpacs.create_aeromap("large_aeromap")
+        aeromap.add_rows(
+            {
+                "altitude": np.zeros(nb_rows),
+                "machNumber": np.tile([0.3, 0.5], nb_rows // 2),
+                "angleOfSideslip": np.zeros(nb_rows),
+                "angleOfAttack": np.arange(nb_rows, dtype=float),
+                "cl": np.ones(nb_rows),
+                damping_col: np.where(np.arange(nb_rows) % 10, np.nan, 0.1),
+            }
+        )
+
+        with patch("cpacspy.aeromap.GET_CACHE_MAX_BYTES", 60_000):
+            for aoa_max in range(10):
+                cl = aeromap.get("cl", mach=0.3, aoa=(None, 8000.0 + aoa_max))
+                assert aeromap.get("cl", mach=0.3, aoa=(None, 8000.0 + aoa_max)) is cl
+
+            # Small results do not keep a copy of the whole column, they all stay cached
+            damping = [aeromap.get(damping_col, aoa=float(aoa)) for aoa in range(100)]
+            assert all(
+                aeromap.get(damping_col, aoa=float(aoa)) is damping[aoa] for aoa in range(100)
+            )
+
+            df_vectors = [aeromap.df[col].to_numpy() for col in aeromap.df.columns]
+            for cache in [aeromap._rows_cache, aeromap._get_cache]:
+                nbytes = 0
+                for value, _ in cache.values():
+                    if not any(np.shares_memory(value, vector) for vector in df_vectors):
+                        nbytes += get_owned_nbytes(value)
+                assert nbytes <= 60_000
+
+            cl_aoa = aeromap.get(["cl", "angleOfAttack"], mach=0.5)
+            assert cl_aoa.nbytes > 60_000
+            assert aeromap.get(["cl", "angleOfAttack"], mach=0.5) is not cl_aoa
+
+
 def test_get_damping_derivatives():
 
     # Load the CPACS file and 'aeromap_test_dampder'
@@ -138,6 +390,159 @@ def test_get_damping_derivatives():
     )
 
 
+def test_get_rows():
+    """Test the function 'get_rows' and the consistency of the AeroMap index."""
+
+    cpacs = CPACS(D150_TESTS_PATH)
+    aeromap_2 = cpacs.get_aeromap_by_uid("aeromap_test2")
+
+    assert aeromap_2.get_rows(alt=0.0, mach=0.2, aos=0.0, aoa=0.0) == [0]
+    assert aeromap_2.get_rows(alt=11000, mach=0.4, aos=2, aoa=2) == [4]
+    assert aeromap_2.get_rows(alt=1111.0, mach=0.2, aos=0.0, aoa=0.0) == []
+    assert aeromap_2.get("cl", alt=11000.0, mach=0.4, aos=2.0, aoa=2.0) == np.array([1.111])
+
+    # Index updated after adding and removing rows
+    aeromap_2.add_row(alt=1111.0, mach=0.2, aos=0.0, aoa=0.0, cl=0.5)
+    assert aeromap_2.get_rows(alt=1111.0, mach=0.2, aos=0.0, aoa=0.0) == [5]
+    aeromap_2.remove_row(alt=0.0, mach=0.2, aos=0.0, aoa=0.0)
+    assert aeromap_2.get_rows(alt=0.0, mach=0.2, aos=0.0, aoa=0.0) == []
+    assert aeromap_2.get_rows(alt=1111.0, mach=0.2, aos=0.0, aoa=0.0) == [4]
+    assert aeromap_2.get("cl", alt=1111.0, mach=0.2, aos=0.0, aoa=0.0) == np.array([0.5])
+
+    # Index rebuilt when the dataframe is replaced
+    aeromap_2.df = aeromap_2.df.iloc[::-1]
+    version = aeromap_2.version
+    cl = aeromap_2.get("cl", mach=0.3)
+    assert aeromap_2.get_rows(alt=1111.0, mach=0.2, aos=0.0, aoa=0.0) == [0]
+
+    # Rebuilding the index does not invalidate the cached data
+    assert aeromap_2.version == version
+    assert aeromap_2.get("cl", mach=0.3) is cl
+
+    # Rows appended directly to the dataframe are detected
+    aeromap_2.df.loc[100] = [0.0, 0.3, 0.0, 8.0] + [0.1] * 6
+    assert aeromap_2.get_rows(alt=0.0, mach=0.3, aos=0.0, aoa=8.0) == [5]
+    assert aeromap_2.version == version + 1
+    assert aeromap_2.get("cl", mach=0.3).size == 4
+
+
+def test_interpolate():
+    """Test the function 'interpolate'."""
+
+    cpacs = CPACS(D150_TESTS_PATH)
+    aeromap_grid = cpacs.create_aeromap("aeromap_test_grid")
+
+    # Full-factorial grid with a multilinear function (which is interpolated exactly)
+    alt, mach, aos, aoa = np.meshgrid(
+        [0.0, 5000.0, 10000.0], [0.2, 0.5, 0.8], [0.0], [-2.0, 0.0, 2.0, 4.0], indexing="ij"
+    )
+    aeromap_grid.add_rows(
+        {
+            "altitude": alt.ravel(),
+            "machNumber": mach.ravel(),
+            "angleOfSideslip": aos.ravel(),
+            "angleOfAttack": aoa.ravel(),
+            "cl": (0.1 + 1e-5 * alt + 0.2 * mach * aoa).ravel(),
+        }
+    )
+
+    alt_q = np.array([0.0, 2500.0, 7300.0, 10000.0])
+    mach_q = np.array([0.2, 0.35, 0.61, 0.8])
+    aoa_q = np.array([-2.0, 1.0, 3.3, 4.0])
+    cl_q = aeromap_grid.interpolate(alt_q, mach_q, 0.0, aoa_q, coefs="cl")
+    assert np.allclose(cl_q, 0.1 + 1e-5 * alt_q + 0.2 * mach_q * aoa_q)
+
+    coefs_q = aeromap_grid.interpolate(alt_q, mach_q, 0.0, aoa_q, coefs=["cl", "cd"])
+    assert np.allclose(coefs_q["cl"], cl_q)
+    assert np.isnan(coefs_q["cd"]).all()
+
+    # Out of bounds options
+    with pytest.raises(ValueError):
+        aeromap_grid.interpolate(0.0, 0.2, 0.0, 6.0, coefs="cl")
+    with pytest.raises(ValueError):
+        aeromap_grid.interpolate(0.0, 0.2, 0.0, 2.0, coefs="cl", out_of_bounds="not_valid")
+    assert np.isnan(aeromap_grid.interpolate(0.0, 0.2, 1.0, 2.0, "cl", out_of_bounds="nan"))
+    assert np.isclose(
+        aeromap_grid.interpolate(0.0, 0.2, 0.0, 6.0, "cl", out_of_bounds="clip"), 0.1 + 0.16
+    )
+    assert np.isclose(
+        aeromap_grid.interpolate(0.0, 0.2, 0.0, 6.0, "cl", out_of_bounds="extrapolate"), 0.1 + 0.24
+    )
+
+    # Cached table is updated when the AeroMap is modified
+    aeromap_grid.add_coefficients(alt=0.0, mach=0.2, aos=0.0, aoa=4.0, cl=1.0)
+    assert np.isclose(aeromap_grid.interpolate(0.0, 0.2, 0.0, 4.0, coefs="cl"), 1.0)
+
+    # Not a full-factorial grid
+    aeromap_grid.add_row(alt=0.0, mach=0.2, aos=0.0, aoa=6.0)
+    with pytest.raises(ValueError):
+        aeromap_grid.interpolate(0.0, 0.2, 0.0, 2.0, coefs="cl")
+
+
+def test_interpolate_scattered(tmp_path):
+    """Test the function 'interpolate_scattered'."""
+
+    cpacs = CPACS(D150_TESTS_PATH)
+    aeromap_scat = cpacs.create_aeromap("aeromap_test_scattered")
+
+    # Random states with a linear function (which is interpolated exactly)
+    rng = np.random.default_rng(42)
+    alt = np.concatenate([[0.0, 0.0, 10000.0, 10000.0] * 2, rng.uniform(0.0, 10000.0, 50)])
+    mach = np.concatenate([[0.2, 0.8] * 4, rng.uniform(0.2, 0.8, 50)])
+    aoa = np.concatenate([[-2.0] * 4 + [4.0] * 4, rng.uniform(-2.0, 4.0, 50)])
+    aeromap_scat.add_rows(
+        {
+            "altitude": alt,
+            "machNumber": mach,
+            "angleOfSideslip": np.zeros(alt.size),
+            "angleOfAttack": aoa,
+            "cl": 0.1 + 1e-5 * alt + 0.5 * mach + 0.1 * aoa,
+        }
+    )
+
+    alt_q = np.array([0.0, 2500.0, 7300.0, 10000.0])
+    mach_q = np.array([0.2, 0.35, 0.61, 0.8])
+    aoa_q = np.array([-2.0, 1.0, 3.3, 4.0])
+    cl_q = aeromap_scat.interpolate_scattered(alt_q, mach_q, 0.0, aoa_q, coefs="cl")
+    assert np.allclose(cl_q, 0.1 + 1e-5 * alt_q + 0.5 * mach_q + 0.1 * aoa_q)
+
+    # Out of bounds options
+    with pytest.raises(ValueError):
+        aeromap_scat.interpolate_scattered(0.0, 0.2, 0.0, 6.0, coefs="cl")
+    with pytest.raises(ValueError):
+        aeromap_scat.interpolate_scattered(0.0, 0.2, 0.0, 2.0, out_of_bounds="clip")
+    assert np.isnan(aeromap_scat.interpolate_scattered(0.0, 0.2, 1.0, 2.0, "cl", "nan"))
+    assert np.isclose(
+        aeromap_scat.interpolate_scattered(0.0, 0.2, 0.0, 6.0, "cl", "nearest"), 0.1 + 0.1 + 0.4
+    )
+
+    # Triangulation cached on disk and reused
+    aeromap_scat.interpolate_scattered(0.0, 0.2, 0.0, 2.0, cache_dir=tmp_path)
+    cache_files = list(tmp_path.glob("triangulation_*.npz"))
+    assert len(cache_files) == 1
+
+    aeromap_copy = cpacs.create_aeromap("aeromap_test_scattered_copy")
+    aeromap_copy.df = aeromap_scat.df.copy()
+    cl_copy = aeromap_copy.interpolate_scattered(
+        alt_q, mach_q, 0.0, aoa_q, coefs="cl", cache_dir=tmp_path
+    )
+    assert np.allclose(cl_copy, cl_q)
+    assert list(tmp_path.glob("triangulation_*.npz")) == cache_files
+
+    # Cache files which are not valid triangulations of the states are not used (nor unpickled)
+    for content in [pickle.dumps(aeromap_copy._triangulation["tri"]), b"not a triangulation"]:
+        cache_files[0].write_bytes(content)
+        aeromap_copy._triangulation = None
+        cl_copy = aeromap_copy.interpolate_scattered(
+            alt_q, mach_q, 0.0, aoa_q, coefs="cl", cache_dir=tmp_path
+        )
+        assert np.allclose(cl_copy, cl_q)
+
+    points = aeromap_copy._triangulation["tri"].points
+    assert load_triangulation(cache_files[0], points) is not None
+    assert load_triangulation(cache_files[0], points + 1.0) is None
+
+
 def test_add_row():
     """Test the function 'add_row'."""
 
@@ -170,6 +575,123 @@ def test_add_row():
         aeromap_1.add_row(alt=11000.0, mach=0.44, aos=0.0, aoa=0.0)
 
 
+def test_add_row_buffer():
+    """Test that rows staged by 'add_row' are correctly appended to the dataframe."""
+
+    cpacs = CPACS(D150_TESTS_PATH)
+    aeromap_3 = cpacs.create_aeromap("aeromap_test_buffer")
+
+    # More rows than the initial size of the buffer
+    for i in range(150):
+        aeromap_3.add_row(alt=0.0, mach=0.3, aos=0.0, aoa=float(i), cl=i * 0.01)
+
+    # Duplicate check also applies to rows still in the buffer
+    with pytest.raises(ValueError):
+        aeromap_3.add_row(alt=0.0, mach=0.3, aos=0.0, aoa=149.0)
+
+    assert len(aeromap_3.df) == 150
+    assert all(aeromap_3.df.dtypes == float)
+    assert aeromap_3.df["angleOfAttack"].tolist() == [float(i) for i in range(150)]
+    assert aeromap_3.get("cl", alt=0.0, mach=0.3, aos=0.0, aoa=120.0) == np.array([1.2])
+
+    # Rows added after the dataframe has been read
+    aeromap_3.add_row(alt=0.0, mach=0.3, aos=0.0, aoa=150.0, cd=0.1)
+    assert aeromap_3.get_rows(alt=0.0, mach=0.3, aos=0.0, aoa=150.0) == [150]
+    assert aeromap_3.get("cd", aoa=150.0) == np.array([0.1])
+
+
+def test_add_rows():
+    """Test the function 'add_rows'."""
+
+    cpacs = CPACS(D150_TESTS_PATH)
+    aeromap_2 = cpacs.get_aeromap_by_uid("aeromap_test2")
+
+    # Test if missing parameters raises ValueError
+    with pytest.raises(ValueError):
+        aeromap_2.add_rows({"altitude": [1000.0], "machNumber": [0.5]})
+
+    # Test if states duplicated in the batch or already existing raise ValueError
+    with pytest.raises(ValueError):
+        aeromap_2.add_rows(
+            {
+                "altitude": [0.0, 0.0],
+                "machNumber": [0.5] * 2,
+                "angleOfSideslip": [0.0] * 2,
+                "angleOfAttack": [0.0] * 2,
+            }
+        )
+    with pytest.raises(ValueError):
+        aeromap_2.add_rows(
+            {
+                "altitude": [0.0],
+                "machNumber": [0.2],
+                "angleOfSideslip": [0.0],
+                "angleOfAttack": [0.0],
+            }
+        )
+    assert len(aeromap_2.df) == 5
+
+    # Add rows from arrays and from a dataframe
+    aoa = np.array([0.0, 2.0, 4.0])
+    aeromap_2.add_rows(
+        {
+            "altitude": np.full(3, 5000.0),
+            "machNumber": np.full(3, 0.5),
+            "angleOfSideslip": np.zeros(3),
+            "angleOfAttack": aoa,
+            "cl": aoa * 0.1,
+        }
+    )
+    aeromap_2.add_rows(
+        pd.DataFrame(
+            {
+                "altitude": [6000.0],
+                "machNumber": [0.5],
+                "angleOfSideslip": [0.0],
+                "angleOfAttack": [0.0],
+                "cd": [0.05],
+            }
+        )
+    )
+
+    assert len(aeromap_2.df) == 9
+    assert (aeromap_2.get("cl", alt=5000.0, mach=0.5) == np.array([0.0, 0.2, 0.4])).all()
+    assert aeromap_2.get("cd", alt=6000.0, mach=0.5, aos=0.0, aoa=0.0) == np.array([0.05])
+    assert np.isnan(aeromap_2.get("cd", alt=5000.0, mach=0.5, aos=0.0, aoa=2.0)[0])
+
+
+def test_update_coefficients():
+    """Test the function 'update_coefficients'."""
+
+    cpacs = CPACS(D150_TESTS_PATH)
+    aeromap_2 = cpacs.get_aeromap_by_uid("aeromap_test2")
+
+    states = {
+        "altitude": [0.0, 11000.0],
+        "machNumber": [0.3, 0.4],
+        "angleOfSideslip": [0.0, 2.0],
+        "angleOfAttack": [4.0, 2.0],
+        "cl": [0.5, 0.6],
+        "dampingDerivatives_positiveRates_dcsdrStar": [0.01, 0.02],
+    }
+    aeromap_2.update_coefficients(states)
+
+    assert aeromap_2.get("cl").tolist() == [0.6666, 0.7777, 0.5, 0.9999, 0.6]
+    assert aeromap_2.get("cd").tolist() == [0.12, 0.13, 0.16, 0.20, 0.25]
+    assert aeromap_2.get(
+        "dampingDerivatives_positiveRates_dcsdrStar", alt=11000.0, mach=0.4, aos=2.0, aoa=2.0
+    ) == np.array([0.02])
+
+    # Test if not existing states raise ValueError, or are added with 'add_missing'
+    states["angleOfAttack"] = [4.0, 8.0]
+    with pytest.raises(ValueError):
+        aeromap_2.update_coefficients(states)
+
+    aeromap_2.update_coefficients(states, add_missing=True)
+    assert len(aeromap_2.df) == 6
+    assert aeromap_2.get("cl", alt=11000.0, mach=0.4, aos=2.0, aoa=8.0) == np.array([0.6])
+
+
 def test_remove_row():
     """Test the function 'remove_row'."""
 
@@ -213,6 +735,33 @@ def test_add_coefficients():
     assert aeromap_1.df["cd"].tolist()[-1] == 0.33
     assert np.isnan(aeromap_1.df["cl"].tolist()[-1])
 
+    # Missing coefficients columns are created, values are written by position even with
+    # duplicated index labels
+    for storage in ["float64", "float32"]:
+        aeromap = cpacs.create_aeromap(f"partial_aeromap_{storage}")
+        aeromap.storage = storage
+        aeromap.df = pd.DataFrame(
+            {
+                "altitude": [0.0, 0.0],
+                "machNumber": [0.3, 0.3],
+                "angleOfSideslip": [0.0, 0.0],
+                "angleOfAttack": [0.0, 2.0],
+                "cl": [0.1, 0.2],
+            },
+            index=[0, 0],
+        )
+        aeromap.add_coefficients(alt=0.0, mach=0.3, aos=0.0, aoa=2.0, cl=0.5, cd=0.05)
+        np.testing.assert_allclose(aeromap.get("cl"), [0.1, 0.5], rtol=1e-6)
+        np.testing.assert_allclose(aeromap.get("cd"), [np.nan, 0.05], rtol=1e-6)
+        assert aeromap.df["cd"].dtype == storage
+
+        aeromap.add_damping_derivatives(
+            alt=0.0, mach=0.3, aos=0.0, aoa=2.0, coef="cl", axis="dp", value=0.3
+        )
+        np.testing.assert_allclose(
+            aeromap.get("dampingDerivatives_negativeRates_dcldpStar"), [np.nan, 0.3], rtol=1e-6
+        )
+
 
 def test_add_damping_derivatives_and_save():
     """Test 'add_damping_derivatives' function"""
@@ -342,6 +891,163 @@ def test_save():
     assert aeromap_3_test.description == "This is a new description"
 
 
+def test_plot_to_files(tmp_path):
+    """Test the batch rendering of AeroMap plots to files."""
+
+    cpacs = CPACS(D150_TESTS_PATH)
+    aeromap_2 = cpacs.get_aeromap_by_uid("aeromap_test2")
+    aeromap_ext = cpacs.get_aeromap_by_uid("extended_aeromap")
+
+    plots = [
+        (aeromap_2, "angleOfAttack", "cl"),
+        (aeromap_ext, "angleOfAttack", "cl", {"alt": 0.0, "mach": 0.3}),
+        (aeromap_ext, "angleOfAttack", "cms", {"alt": 0.0, "mach": (0.3, 0.5)}),
+    ]
+    file_paths = plot_aeromaps_to_files(plots, Path(tmp_path, "plots"), nb_proc=2)
+    assert [Path(path).name for path in file_paths] == [
+        "aeromap_test2_cl_vs_angleOfAttack_0.png",
+        "extended_aeromap_cl_vs_angleOfAttack_1.png",
+        "extended_aeromap_cms_vs_angleOfAttack_2.png",
+    ]
+    assert all(Path(path).read_bytes().startswith(b"\x89PNG") for path in file_paths)
+
+    file_paths = aeromap_2.plot_to_files(
+        [("angleOfAttack", "cl"), ("machNumber", "cd", {"alt": 0.0})],
+        tmp_path,
+        file_format="svg",
+        nb_proc=1,
+    )
+    assert len(file_paths) == 2
+    assert all("<svg" in Path(path).read_text() for path in file_paths)
+
+    with pytest.raises(ValueError):
+        aeromap_2.plot_to_files([("angleOfAttack", "cl")], tmp_path, file_format="jpg")
+
+
+def test_save_only_modified_vectors():
+    """Test that 'save' only rewrites the vectors which have been modified."""
+
+    cpacs = CPACS(D150_TESTS_PATH)
+    aeromap_2 = cpacs.get_aeromap_by_uid("aeromap_test2")
+    cl_xpath = aeromap_2.xpath + "/cl"
+    cd_xpath = aeromap_2.xpath + "/cd"
+    cl_text = cpacs.tixi.getTextElement(cl_xpath)
+
+    # Nothing modified, the vectors are not rewritten (original formatting is kept)
+    aeromap_2.save()
+    assert cpacs.tixi.getTextElement(cl_xpath) == cl_text
+
+    # Only the modified vector is rewritten
+    aeromap_2.add_coefficients(alt=0.0, mach=0.2, aos=0.0, aoa=0.0, cd=0.11, cl=0.6666)
+    aeromap_2.save()
+    assert cpacs.tixi.getTextElement(cl_xpath) == cl_text
+    assert get_float_vector(cpacs.tixi, cd_xpath) == [0.11, 0.13, 0.16, 0.20, 0.25]
+
+    # Modifications made directly on the dataframe are also detected
+    aeromap_2.df["cl"] = aeromap_2.df["cl"] * 2
+    aeromap_2.save()
+    assert get_float_vector(cpacs.tixi, cl_xpath) == [1.3332, 1.5554, 1.7776, 1.9998, 2.222]
+
+    # Vector removed from the CPACS file is written again
+    cpacs.tixi.removeElement(cd_xpath)
+    aeromap_2.save()
+    assert get_float_vector(cpacs.tixi, cd_xpath) == [0.11, 0.13, 0.16, 0.20, 0.25]
+
+
+def test_storage():
+    """Test the "float32" and "compact" storage policies of the AeroMap dataframe."""
+
+    cpacs = CPACS(D150_TESTS_PATH)
+    cpacs_compact = CPACS(D150_TESTS_PATH, aeromap_storage="compact")
+    aeromap = cpacs.get_aeromap_by_uid("aeromap_test_dampder")
+    aeromap_compact = cpacs_compact.get_aeromap_by_uid("aeromap_test_dampder")
+    damping_col = "dampingDerivatives_negativeRates_dcsdrStar"
+
+    with pytest.raises(ValueError):
+        AeroMap(cpacs.tixi, "new_aeromap", create_new=True, storage="float16")
+
+    # Parameters are kept as float64, coefficients as float32 and mostly NaN damping
+    # derivatives as sparse columns
+    assert aeromap_compact.df["altitude"].dtype == np.float64
+    assert aeromap_compact.df["cl"].dtype == np.float32
+    assert any(isinstance(dtype, pd.SparseDtype) for dtype in aeromap_compact.df.dtypes)
+    assert aeromap_compact.df.memory_usage().sum() < aeromap.df.memory_usage().sum()
+
+    # Filtering and get give the same results (with float32 precision for coefficients)
+    np.testing.assert_array_equal(
+        aeromap_compact.get("angleOfAttack", mach=0.555),
+        aeromap.get("angleOfAttack", mach=0.555),
+    )
+    np.testing.assert_allclose(
+        aeromap_compact.get("cl", mach=0.555), aeromap.get("cl", mach=0.555), rtol=1e-6
+    )
+    assert aeromap_compact.get("cl", mach=0.555).dtype == np.float64
+
+    # Sparse columns can be modified
+    assert isinstance(aeromap_compact.df[damping_col].dtype, pd.SparseDtype)
+    aeromap_compact.add_damping_derivatives(
+        alt=15000.0, mach=0.555, aos=0.0, aoa=0.0, coef="cs", axis="dr", value=0.12
+    )
+    assert aeromap_compact.get(damping_col, mach=0.555, aoa=0.0) == pytest.approx([0.12])
+
+    # Nothing modified, vectors are not rewritten
+    aeromap_2 = cpacs_compact.get_aeromap_by_uid("aeromap_test2")
+    cl_xpath = aeromap_2.xpath + "/cl"
+    cl_text = cpacs_compact.tixi.getTextElement(cl_xpath)
+    aeromap_2.save()
+    assert cpacs_compact.tixi.getTextElement(cl_xpath) == cl_text
+
+    # Rows added by 'add_row' and changing the storage policy
+    aeromap_2.add_row(alt=0.0, mach=0.7, aos=0.0, aoa=0.0, cl=0.5)
+    assert aeromap_2.df["cl"].dtype == np.float32
+    aeromap_2.storage = "float64"
+    assert all(aeromap_2.df.dtypes == float)
+    assert aeromap_2.get("cl", mach=0.7) == [0.5]
+
+
+def test_storage_modifications():
+    """Test that AeroMaps with "float32" and "compact" storage can be modified without type
+    warnings and keep the types of their storage policy."""
+
+    state = {"alt": 15000.0, "mach": 0.555, "aos": 0.0, "aoa": 0.0}
+    damping_col = "dampingDerivatives_negativeRates_dcsdrStar"
+    new_col = "dampingDerivatives_positiveRates_dcldpStar"
+
+    for storage in ["float32", "compact"]:
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", FutureWarning)
+
+            cpacs = CPACS(D150_TESTS_PATH, aeromap_storage=storage)
+            aeromap = cpacs.get_aeromap_by_uid("aeromap_test_dampder")
+
+            aeromap.add_coefficients(**state, cl=0.1234, cd=0.0123)
+            aeromap.update_coefficients(
+                {
+                    "altitude": [15000.0],
+                    "machNumber": [0.555],
+                    "angleOfSideslip": [0.0],
+                    "angleOfAttack": [0.0],
+                    "cms": [0.5],
+                    new_col: [0.2],
+                }
+            )
+            aeromap.add_damping_derivatives(**state, coef="cs", axis="dr", value=0.12)
+
+            assert aeromap.get("cl", **state) == pytest.approx([0.1234])
+            assert aeromap.get("cms", **state) == pytest.approx([0.5])
+            assert aeromap.get(new_col, **state) == pytest.approx([0.2])
+            assert aeromap.get(damping_col, **state) == pytest.approx([0.12])
+            for col in ["cl", "cms", new_col, damping_col]:
+                assert aeromap.df[col].dtype == np.float32
+            assert aeromap.df["altitude"].dtype == np.float64
+
+            # Modified damping derivatives are stored as sparse columns again when saved
+            aeromap.save()
+            if storage == "compact":
+                assert isinstance(aeromap.df[damping_col].dtype, pd.SparseDtype)
+            assert aeromap.get(damping_col, **state) == pytest.approx([0.12])
+
+
 def test_csv():
     """Test 'create_aeromap_from_csv' (from cpacspy.py) and
     'export_csv' function (with damping derivatives coefficients in the aeroMap)"""
@@ -364,14 +1070,215 @@ def test_csv():
         CSV_OUT_FILE.unlink()
 
 
+def test_parquet(tmp_path):
+    """Test 'export_parquet', 'to_arrow' and 'create_aeromap_from_parquet' (from cpacspy.py)
+    with damping derivatives coefficients and metadata in the aeroMap."""
+
+    cpacs = CPACS(D150_TESTS_PATH)
+    aeromap_dampder = cpacs.get_aeromap_by_uid("aeromap_test_dampder")
+    aeromap_dampder.description = "Aeromap with damping derivatives"
+    aeromap_dampder.add_coefficients(
+        alt=15000.0, mach=0.555, aos=0.0, aoa=0.0, cl=0.1234567890123, cd=0.0123
+    )
+
+    table = aeromap_dampder.to_arrow()
+    assert table.schema.metadata[b"uid"] == b"aeromap_test_dampder"
+    assert table.schema.metadata[b"description"] == b"Aeromap with damping derivatives"
+    assert table.num_rows == len(aeromap_dampder.df)
+
+    parquet_path = Path(tmp_path, "aeromap_test.parquet")
+    aeromap_dampder.export_parquet(parquet_path)
+
+    # uid from the metadata cannot be reused in the same CPACS file
+    with pytest.raises(ValueError):
+        cpacs.create_aeromap_from_parquet(parquet_path)
+
+    with pytest.raises(ValueError):
+        cpacs.create_aeromap_from_parquet(Path(tmp_path, "not_existing.parquet"))
+
+    aeromap_parquet = cpacs.create_aeromap_from_parquet(parquet_path, uid="aeromap_parquet")
+    assert aeromap_parquet.uid == "aeromap_parquet"
+    assert aeromap_parquet.name == aeromap_dampder.name
+    assert aeromap_parquet.description == "Aeromap with damping derivatives"
+    assert aeromap_parquet.atmospheric_model == "ISA"
+    assert all(aeromap_parquet.df.dtypes == float)
+    pd.testing.assert_frame_equal(
+        aeromap_parquet.df.reset_index(drop=True), aeromap_dampder.df.reset_index(drop=True)
+    )
+
+    # AeroMap created from the parquet file can be modified
+    aeromap_parquet.add_coefficients(alt=15000.0, mach=0.555, aos=0.0, aoa=0.0, cl=0.5)
+    assert aeromap_parquet.get("cl", alt=15000.0, mach=0.555, aos=0.0, aoa=0.0) == [0.5]
+
+    # Columns are shared with Arrow tables and copied before being modified
+    table = aeromap_dampder.to_arrow()
+    cl_table = table.column("cl").chunk(0).to_numpy()
+    assert np.shares_memory(cl_table, aeromap_dampder.df["cl"].to_numpy())
+    aeromap_dampder.add_coefficients(alt=15000.0, mach=0.555, aos=0.0, aoa=0.0, cl=0.5)
+    assert cl_table[0] == 0.1234567890123
+
+    aeromap_arrow = cpacs.create_aeromap_from_arrow(table, uid="aeromap_arrow")
+    assert np.shares_memory(cl_table, aeromap_arrow.df["cl"].to_numpy())
+    aeromap_arrow.add_coefficients(alt=15000.0, mach=0.555, aos=0.0, aoa=0.0, cl=0.5)
+    assert aeromap_arrow.get("cl", alt=15000.0, mach=0.555, aos=0.0, aoa=0.0) == [0.5]
+    assert cl_table[0] == 0.1234567890123
+
+    # Only the columns which are views of the table are shared
+    import pyarrow as pa
+
+    table = pa.table(
+        {
+            "altitude": pa.array([0.0, 1000.0]),
+            "machNumber": pa.array([0.3, 0.4], type=pa.float32()),
+            "cl": pa.array([0.1, None]),
+        }
+    )
+    aeromap_arrow = cpacs.create_aeromap("aeromap_arrow_2")
+    aeromap_arrow.df_from_arrow(table)
+    assert aeromap_arrow._shared_columns == {"altitude"}
+    assert np.isnan(aeromap_arrow.df["cl"].iloc[1])
+
+    # uid from the metadata is used by default
+    cpacs_new = CPACS(D150_TESTS_PATH)
+    cpacs_new.delete_aeromap("aeromap_test_dampder")
+    aeromap_new = cpacs_new.create_aeromap_from_parquet(str(parquet_path))
+    assert aeromap_new.uid == "aeromap_test_dampder"
+
+
 def test_get_cd0_oswald():
     """TODO: create the test when the function is finalized!"""
     pass
 
 
+def test_get_cd0_oswald_sweep():
+    """Test 'get_cd0_oswald_sweep' function."""
+
+    cpacs = CPACS(D150_TESTS_PATH)
+    aeromap_polar = cpacs.create_aeromap("aeromap_test_polar")
+
+    # Parabolic drag polars cd = cd0 + k * cl^2 (with one negative cl which must be ignored)
+    aoa = np.array([-4.0, 0.0, 2.0, 4.0, 6.0])
+    cl = 0.1 * aoa + 0.2
+    for alt, mach, cd0, k in [(0.0, 0.3, 0.02, 0.05), (10000.0, 0.3, 0.025, 0.06)]:
+        aeromap_polar.add_rows(
+            {
+                "altitude": np.full(aoa.size, alt),
+                "machNumber": np.full(aoa.size, mach),
+                "angleOfSideslip": np.zeros(aoa.size),
+                "angleOfAttack": aoa,
+                "cl": cl,
+                "cd": cd0 + k * cl**2 + np.where(cl < 0, 1.0, 0.0),
+            }
+        )
+    aeromap_polar.add_row(alt=0.0, mach=0.5, aos=0.0, aoa=0.0, cl=0.2, cd=0.03)
+
+    sweep = aeromap_polar.get_cd0_oswald_sweep(ar=9.0)
+
+    assert sweep[["altitude", "machNumber"]].values.tolist() == [
+        [0.0, 0.3],
+        [0.0, 0.5],
+        [10000.0, 0.3],
+    ]
+    assert np.allclose(sweep["cd0"].iloc[[0, 2]], [0.02, 0.025])
+    assert np.allclose(
+        sweep["oswald_factor"].iloc[[0, 2]], 1 / (np.array([0.05, 0.06]) * 9.0 * np.pi)
+    )
+
+    # Only one point for this condition
+    assert np.isnan(sweep["cd0"].iloc[1])
+    assert np.isnan(sweep["oswald_factor"].iloc[1])
+
+    # Same values as 'get_cd0_oswald'
+    cd0, e = aeromap_polar.get_cd0_oswald(ar=9.0, alt=10000.0, mach=0.3, aos=0.0)
+    assert np.isclose(sweep["cd0"].iloc[2], cd0)
+    assert np.isclose(sweep["oswald_factor"].iloc[2], e)
+
+
 def test_calcuate_forces():
-    """TODO: create the test when the function is finalized!"""
-    pass
+    """Test 'calculate_forces' function."""
+
+    cpacs = CPACS(D150_TESTS_PATH)
+    aeromap_2 = cpacs.get_aeromap_by_uid("aeromap_test2")
+    aeromap_2.calculate_forces(cpacs.aircraft)
+
+    # Reference values calculated row by row with ambiance
+    df = aeromap_2.df
+    for i in range(len(df)):
+        atm = Atmosphere(df["altitude"].iloc[i])
+        q_ref_area = (
+            0.5
+            * atm.density[0]
+            * cpacs.aircraft.ref_area
+            * (df["machNumber"].iloc[i] * atm.speed_of_sound[0]) ** 2
+        )
+        np.testing.assert_array_equal(
+            df[["drag", "lift", "side"]].iloc[i].to_numpy(),
+            q_ref_area * df[["cd", "cl", "cs"]].iloc[i].to_numpy(),
+        )
+        np.testing.assert_array_equal(
+            df[["md", "ml", "ms"]].iloc[i].to_numpy(),
+            q_ref_area * df[["cmd", "cml", "cms"]].iloc[i].to_numpy() * cpacs.aircraft.ref_length,
+        )
+
+    # Large random AeroMap, results are identical to the row by row computation
+    rng = np.random.default_rng(0)
+    nb_rows = 3000
+    aeromap = cpacs.create_aeromap("random_aeromap")
+    aeromap.add_rows(
+        {
+            "altitude": rng.uniform(0.0, 20000.0, nb_rows),
+            "machNumber": rng.uniform(0.1, 0.9, nb_rows),
+            "angleOfSideslip": np.zeros(nb_rows),
+            "angleOfAttack": np.arange(nb_rows, dtype=float),
+            "cd": rng.uniform(0.0, 0.1, nb_rows),
+            "cms": rng.uniform(-0.1, 0.1, nb_rows),
+        }
+    )
+    aeromap.calculate_forces(cpacs.aircraft)
+
+    drag = []
+    ms = []
+    for alt, mach, cd, cms in aeromap.df[["altitude", "machNumber", "cd", "cms"]].to_numpy():
+        atm = Atmosphere(alt)
+        q_ref_area = (
+            0.5
+            * atm.density[0]
+            * cpacs.aircraft.ref_area
+            * (np.float64(mach) * atm.speed_of_sound[0]) ** 2
+        )
+        drag.append(q_ref_area * cd)
+        ms.append(q_ref_area * cms * cpacs.aircraft.ref_length)
+
+    np.testing.assert_array_equal(aeromap.df["drag"].to_numpy(), drag)
+    np.testing.assert_array_equal(aeromap.df["ms"].to_numpy(), ms)
+
+
+def test_get_atmosphere_properties():
+    """Test 'get_atmosphere_properties' function."""
+
+    altitudes = np.array([11000.0, 0.0, 11000.0, 5000.0])
+    dens, sos = get_atmosphere_properties(altitudes)
+
+    assert dens.shape == altitudes.shape
+    assert sos.shape == altitudes.shape
+    for i, alt in enumerate(altitudes):
+        assert dens[i] == Atmosphere(alt).density[0]
+        assert sos[i] == Atmosphere(alt).speed_of_sound[0]
+
+    assert 5000.0 in ATMOSPHERE_CACHE
+
+    # The cache keeps only the most recently used altitudes
+    with patch("cpacspy.aeromap.ATMOSPHERE_CACHE_SIZE", 8):
+        dens, sos = get_atmosphere_properties(np.arange(20) * 100.0)
+        assert len(ATMOSPHERE_CACHE) == 8
+        assert 1900.0 in ATMOSPHERE_CACHE
+        assert 5000.0 not in ATMOSPHERE_CACHE
+        assert dens[0] == Atmosphere(0.0).density[0]
+        assert sos[-1] == Atmosphere(1900.0).speed_of_sound[0]
+
+        dens, _ = get_atmosphere_properties(np.array([5000.0, 1900.0]))
+        assert dens[0] == Atmosphere(5000.0).density[0]
+        assert len(ATMOSPHERE_CACHE) == 8
 
 
 def test_check_longitudinal_stability():
@@ -501,3 +1408,96 @@ def test_check_lateral_stability():
     stability, msg = aeromap_6.check_lateral_stability(alt=[7000, 8000], mach=[0.3, 0.4])
     assert stability
     assert msg == MSG_STAB_ONE_PARAM
+
+
+def test_get_trim():
+    """Test the trim analysis of all the conditions of an AeroMap."""
+
+    cpacs = CPACS(D150_TESTS_PATH)
+    aeromap = cpacs.create_aeromap("trim_aeromap")
+
+    aoa = np.arange(-4.0, 12.0, 2.0)
+    aeromap.add_rows(
+        {
+            "altitude": np.repeat([0.0, 1000.0, 2000.0], len(aoa)),
+            "machNumber": 0.3,
+            "angleOfSideslip": 0.0,
+            "angleOfAttack": np.tile(aoa, 3),
+            "cl": np.tile(0.1 * aoa, 3),
+            "cms": np.concatenate([0.1 - 0.02 * aoa, 0.05 - 0.002 * aoa**2, aoa * 0 + 0.1]),
+        }
+    )
+
+    trim = aeromap.get_trim()
+    assert trim.columns.tolist() == PARAMS + ["cd", "cl", "cs", "cmd", "cml"]
+    assert trim["altitude"].tolist() == [0.0, 1000.0, 2000.0]
+    assert trim["angleOfAttack"][0] == pytest.approx(5.0)
+    assert trim["cl"][0] == pytest.approx(0.5)
+    assert trim["angleOfAttack"][1] == pytest.approx(4.9)
+    assert np.isnan(trim["angleOfAttack"][2])
+    assert np.isnan(trim["cl"][2])
+
+    # Spline interpolation is exact for linear and quadratic cms
+    trim = aeromap.get_trim(coefs=["cl"], method="spline")
+    assert trim.columns.tolist() == PARAMS + ["cl"]
+    assert trim["angleOfAttack"][0] == pytest.approx(5.0)
+    assert trim["angleOfAttack"][1] == pytest.approx(5.0)
+    assert trim["cl"][1] == pytest.approx(0.5)
+
+    with pytest.raises(ValueError):
+        aeromap.get_trim(method="cubic")
+
+
+def test_check_stability_sweep():
+    """Test 'check_stability_sweep' function, results must be the same as the functions which
+    check the stability for one condition at the time."""
+
+    cpacs = CPACS(D150_TESTS_PATH)
+    aeromap_7 = cpacs.create_aeromap("aeromap_test_stab_sweep")
+
+    aeromap_7.add_row(alt=10000, mach=0.3, aoa=0.0, aos=0.0, cms=0.3, cml=0.1, cmd=0.1)
+    aeromap_7.add_row(alt=10000, mach=0.3, aoa=5.0, aos=0.0, cms=0.3, cml=-0.1, cmd=0.2)
+    aeromap_7.add_row(alt=10000, mach=0.3, aoa=0.0, aos=2.0, cms=0.2, cml=0.2, cmd=0.0)
+    aeromap_7.add_row(alt=10000, mach=0.3, aoa=5.0, aos=2.0, cms=0.1, cml=0.1, cmd=0.2)
+    aeromap_7.add_row(alt=8000, mach=0.3, aoa=-2.0, aos=0.0, cms=0.2, cml=0.0, cmd=0.0)
+    aeromap_7.add_row(alt=8000, mach=0.3, aoa=0.0, aos=0.0, cms=0.1, cml=0.1, cmd=0.0)
+    aeromap_7.add_row(alt=8000, mach=0.3, aoa=2.0, aos=0.0, cms=0.1, cml=0.1, cmd=0.0)
+    aeromap_7.add_row(alt=8000, mach=0.3, aoa=4.0, aos=0.0, cms=-0.1, cml=0.1, cmd=0.0)
+
+    with pytest.raises(ValueError):
+        aeromap_7.check_stability_sweep(axes="not_an_axis")
+
+    sweep = aeromap_7.check_stability_sweep()
+    assert list(sweep.columns) == [
+        "axis",
+        "altitude",
+        "machNumber",
+        "angleOfSideslip",
+        "angleOfAttack",
+        "slope",
+        "stable",
+        "msg",
+    ]
+    assert len(sweep) == 3 + 6 + 6
+
+    for row in sweep.itertuples():
+        if row.axis == "longitudinal":
+            assert np.isnan(row.angleOfAttack)
+            stability, msg = aeromap_7.check_longitudinal_stability(
+                alt=row.altitude, mach=row.machNumber, aos=row.angleOfSideslip
+            )
+        elif row.axis == "directional":
+            assert np.isnan(row.angleOfSideslip)
+            stability, msg = aeromap_7.check_directional_stability(
+                alt=row.altitude, mach=row.machNumber, aoa=row.angleOfAttack
+            )
+        else:
+            stability, msg = aeromap_7.check_lateral_stability(
+                alt=row.altitude, mach=row.machNumber, aoa=row.angleOfAttack
+            )
+        assert row.stable == stability
+        assert row.msg == msg
+
+    sweep_long = aeromap_7.check_stability_sweep(axes="longitudinal")
+    assert set(sweep_long["axis"]) == {"longitudinal"}
+    assert np.isclose(sweep_long["slope"].iloc[0], -0.045)
@@ -216,6 +216,26 @@ def test_get_float_vector():
     xpath = "/cpacs/toolspecific/pytest/aCorrectFloatVector"
     get_float_vector(tixi, xpath) == [1, 0.95, 0.9, 0.8, 0.7, 0.6]
 
+    # Return a correct float vector as a numpy array
+    float_vector = get_float_vector(tixi, xpath, as_array=True)
+    assert isinstance(float_vector, np.ndarray)
+    assert float_vector.dtype == np.float64
+    assert float_vector.tolist() == [1, 0.95, 0.9, 0.8, 0.7, 0.6]
+
+    # Vector with NaN values
+    xpath = "/cpacs/toolspecific/pytest/aFloatVectorWithNaN"
+    add_string_vector(tixi, xpath, ["1.5", "nan", "NaN", "-2e3"])
+    float_vector = get_float_vector(tixi, xpath)
+    assert float_vector[0] == 1.5
+    assert np.isnan(float_vector[1]) and np.isnan(float_vector[2])
+    assert float_vector[3] == -2000.0
+
+    # Raise ValueError when a value is not a float
+    xpath = "/cpacs/toolspecific/pytest/aWrongFloatVector"
+    add_string_vector(tixi, xpath, ["1.5", "abc", "2"])
+    with pytest.raises(ValueError):
+        get_float_vector(tixi, xpath)
+
 
 def test_add_float_vector():
 
@@ -22,17 +22,62 @@ Author: Aidan Jungo
 
 """
 
+import os
+import subprocess
+import sys
+import tracemalloc
 from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
 import pytest
 
+from cpacspy.aeromap import LazyAeroMap, get_duplicated_rows
+from cpacspy.cpacsfunctions import get_float_vector, open_tigl
 from cpacspy.cpacspy import CPACS
-from cpacspy.utils import D150_TESTS_PATH, TESTS_PATH
+from cpacspy.utils import D150_TESTS_PATH, PARAMS_COEFS, TESTS_PATH
 
 CSV_PATH = Path(TESTS_PATH, "aeromap_test_2.csv")
 
+# Maximum time to import cpacspy, without numpy and pandas [s]
+IMPORT_TIME_BUDGET = 0.5
 
-def test_main_attrib():
+# Modules which must not be imported by 'import cpacspy.cpacspy'
+DEFERRED_MODULES = ["ambiance", "concurrent", "matplotlib", "scipy", "tigl3", "tixi3"]
+
+
+def test_import_time():
+    """Test that heavy dependencies are not imported with cpacspy and the import time budget."""
+
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import cpacspy.cpacspy"],
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+        check=True,
+    )
+
+    # Lines are "import time: self [us] | cumulative [us] | module name"
+    cumulative_times = {}
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, cumulative, module = line.split("|")
+            if cumulative.strip().isdigit():
+                cumulative_times[module.strip()] = int(cumulative) * 1e-6
+
+    imported = {module.split(".")[0] for module in cumulative_times}
+    assert not imported.intersection(DEFERRED_MODULES)
 
+    import_time = (
+        cumulative_times["cpacspy.cpacspy"]
+        - cumulative_times.get("numpy", 0)
+        - cumulative_times.get("pandas", 0)
+    )
+    assert import_time < IMPORT_TIME_BUDGET
+
+
+def test_main_attrib():
     """Test main attributes of the CPACS class"""
 
     # Load the CPACS file and all AeroMap in it
@@ -46,6 +91,54 @@ def test_main_attrib():
     # tixi_handle = open_tixi('invalid_CPACS_path')
 
 
+def test_lazy_aeromaps():
+
+    cpacs = CPACS(D150_TESTS_PATH, lazy_aeromaps=True)
+
+    assert cpacs.nb_aeromaps == 4
+    assert all(isinstance(aeromap, LazyAeroMap) for aeromap in cpacs.aeromaps)
+    assert not any(aeromap.is_loaded for aeromap in cpacs.aeromaps)
+
+    # AeroMap only loaded when accessed
+    aeromap_2 = cpacs.get_aeromap_by_uid("aeromap_test2")
+    assert not aeromap_2.is_loaded
+    assert aeromap_2.get("cl", alt=11000.0, mach=0.4) == np.array([1.111])
+    assert aeromap_2.is_loaded
+    assert aeromap_2.description == "Common default aeroMap"
+    assert not cpacs.get_aeromap_by_uid("aeromap_test1").is_loaded
+
+    # Same data as an AeroMap loaded directly
+    cpacs_eager = CPACS(D150_TESTS_PATH)
+    aeromap_eager = cpacs_eager.get_aeromap_by_uid("aeromap_test_dampder")
+    aeromap_lazy = cpacs.get_aeromap_by_uid("aeromap_test_dampder")
+    assert aeromap_lazy.xpath == aeromap_eager.xpath
+    assert aeromap_lazy.df.equals(aeromap_eager.df)
+
+    # Modifying an attribute before any access must not be overwritten by the loading
+    aeromap_1 = cpacs.get_aeromap_by_uid("aeromap_test1")
+    aeromap_1.description = "New description"
+    assert aeromap_1.is_loaded
+    assert aeromap_1.description == "New description"
+
+
+def test_lazy_geometry():
+
+    with patch("cpacspy.cpacspy.open_tigl", wraps=open_tigl) as mock_open_tigl:
+        cpacs = CPACS(D150_TESTS_PATH, lazy_geometry=True)
+        assert cpacs.nb_aeromaps == 4
+        mock_open_tigl.assert_not_called()
+
+        # TiGL is opened and the aircraft created at the first access
+        aircraft = cpacs.aircraft
+        assert mock_open_tigl.call_count == 1
+        assert cpacs.aircraft is aircraft
+        assert cpacs.aircraft.tigl is cpacs.tigl
+        assert mock_open_tigl.call_count == 1
+
+    # No rotorcraft in this CPACS file
+    assert not hasattr(cpacs, "rotorcraft")
+
+
 def test_get_aeromap_uid_list():
 
     cpacs = CPACS(D150_TESTS_PATH)
@@ -59,6 +152,29 @@ def test_get_aeromap_uid_list():
     ]
 
 
+def test_aeromap_registry():
+
+    cpacs = CPACS(D150_TESTS_PATH)
+
+    # Uid list and lookups are served by the registry, without access to the CPACS file
+    with patch.object(cpacs.tixi, "getTextAttribute") as mock_get_text_attribute:
+        assert cpacs.get_aeromap_uid_list()[0] == "aeromap_test1"
+        assert cpacs.get_aeromap_by_uid("extended_aeromap").uid == "extended_aeromap"
+        mock_get_text_attribute.assert_not_called()
+
+    # New aeromaps are part of the registry before being saved in the CPACS file
+    new_aeromap = cpacs.create_aeromap("new_aeromap")
+    assert cpacs.get_aeromap_uid_list()[-1] == "new_aeromap"
+    assert cpacs.aeromaps[-1] is new_aeromap
+    with pytest.raises(ValueError):
+        cpacs.create_aeromap("new_aeromap")
+
+    # An aeromap which has not been saved is only removed from the registry
+    cpacs.delete_aeromap("new_aeromap")
+    assert "new_aeromap" not in cpacs.get_aeromap_uid_list()
+    assert cpacs.nb_aeromaps == 4
+
+
 def test_get_aeromap_by_uid():
 
     cpacs = CPACS(D150_TESTS_PATH)
@@ -103,6 +219,69 @@ def test_create_aeromap_from_csv():
     assert cpacs.nb_aeromaps == 5
 
 
+def test_create_aeromap_from_csv_chunksize(tmp_path):
+
+    cpacs = CPACS(D150_TESTS_PATH)
+    eager_aeromap = cpacs.create_aeromap_from_csv(CSV_PATH, uid="eager")
+
+    # Streamed CSV must give the same aeromap as a read at once
+    nb_rows_read = []
+    aeromap = cpacs.create_aeromap_from_csv(
+        CSV_PATH, uid="streamed", chunksize=2, progress=nb_rows_read.append
+    )
+    pd.testing.assert_frame_equal(aeromap.df, eager_aeromap.df)
+    assert nb_rows_read[-1] == len(eager_aeromap.df)
+    assert nb_rows_read == sorted(nb_rows_read)
+
+    # Coefficients could be stored with another type, parameters stay float64
+    aeromap = cpacs.create_aeromap_from_csv(
+        CSV_PATH, uid="float32", chunksize=2, coef_dtype=np.float32
+    )
+    assert aeromap.df["cl"].dtype == np.float32
+    assert aeromap.df["altitude"].dtype == np.float64
+
+    # Raise error when a state is duplicated in another chunk
+    csv_lines = CSV_PATH.read_text().splitlines()
+    duplicated_csv = Path(tmp_path, "duplicated.csv")
+    duplicated_csv.write_text("\n".join(csv_lines + [csv_lines[1]]) + "\n")
+    with pytest.raises(ValueError):
+        cpacs.create_aeromap_from_csv(duplicated_csv, chunksize=2)
+    assert "duplicated" not in cpacs.get_aeromap_uid_list()
+
+    # Same state written with 0.0 and -0.0
+    zero_csv = Path(tmp_path, "zero.csv")
+    alt, mach, _, aoa, *coefs = csv_lines[1].split(",")
+    zero_line = ",".join([alt, mach, "-0.0", aoa] + coefs)
+    zero_csv.write_text("\n".join(csv_lines + [zero_line]) + "\n")
+    with pytest.raises(ValueError):
+        cpacs.create_aeromap_from_csv(zero_csv, chunksize=2)
+
+    # Colliding hashes of different states are not duplicates
+    states = pd.DataFrame(np.arange(16.0).reshape(4, 4), columns=PARAMS_COEFS[:4])
+    assert get_duplicated_rows(states, np.zeros(4, dtype=np.uint64)).size == 0
+    states.iloc[3] = states.iloc[1]
+    np.testing.assert_array_equal(get_duplicated_rows(states, np.zeros(4, dtype=np.uint64)), [3])
+
+
+def test_create_aeromap_from_csv_chunksize_memory(tmp_path):
+    """Test that streaming a CSV file does not need much more memory than the AeroMap data."""
+
+    csv_path = Path(tmp_path, "large_aeromap.csv")
+    rng = np.random.default_rng(0)
+    pd.DataFrame(rng.random((100_000, 10)), columns=PARAMS_COEFS).to_csv(csv_path, index=False)
+
+    cpacs = CPACS(D150_TESTS_PATH)
+    tracemalloc.start()
+    try:
+        aeromap = cpacs.create_aeromap_from_csv(csv_path, uid="large", chunksize=5000)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert len(aeromap.df) == 100_000
+    assert peak < 2 * aeromap.df.memory_usage(index=False).sum()
+
+
 def test_duplicate_aeromap():
 
     cpacs = CPACS(D150_TESTS_PATH)
@@ -121,6 +300,44 @@ def test_duplicate_aeromap():
     assert cpacs.nb_aeromaps == 5
 
 
+def test_duplicate_aeromap_copy_on_write():
+
+    cpacs = CPACS(D150_TESTS_PATH)
+    aeromap_base = cpacs.get_aeromap_by_uid("aeromap_test2")
+    aeromap_dup = cpacs.duplicate_aeromap("aeromap_test2", "duplicated_aeromap")
+
+    def shares_column(col):
+        return np.shares_memory(aeromap_base.df[col].to_numpy(), aeromap_dup.df[col].to_numpy())
+
+    # Data are shared until a column is modified
+    assert shares_column("cl")
+    assert shares_column("altitude")
+
+    aeromap_dup.add_coefficients(alt=0.0, mach=0.2, aos=0.0, aoa=0.0, cd=0.5, cl=0.5)
+    assert aeromap_dup.get("cl", mach=0.2) == [0.5]
+    assert aeromap_base.get("cl", mach=0.2) == [0.6666]
+    assert not shares_column("cl")
+    assert shares_column("altitude")
+
+    # Modifications of the base aeromap do not change the duplicate
+    aeromap_base.update_coefficients(
+        {
+            "altitude": [0.0],
+            "machNumber": [0.3],
+            "angleOfSideslip": [0.0],
+            "angleOfAttack": [2.0],
+            "cd": [1.0],
+        }
+    )
+    assert aeromap_base.get("cd", mach=0.3, aoa=2.0) == [1.0]
+    assert aeromap_dup.get("cd", mach=0.3, aoa=2.0) == [0.13]
+
+    aeromap_base.add_damping_derivatives(
+        alt=0.0, mach=0.2, aos=0.0, aoa=0.0, coef="cl", axis="dp", value=0.1
+    )
+    assert "dampingDerivatives_negativeRates_dcldpStar" not in aeromap_dup.df
+
+
 def test_delete_aeromap():
 
     cpacs = CPACS(D150_TESTS_PATH)
@@ -157,6 +374,38 @@ def test_delete_aeromap():
     assert cpacs.nb_aeromaps == 0
 
 
+def test_delete_aeromap_incremental():
+
+    cpacs = CPACS(D150_TESTS_PATH)
+    aeromap_2 = cpacs.get_aeromap_by_uid("aeromap_test2")
+    aeromap_dampder = cpacs.get_aeromap_by_uid("aeromap_test_dampder")
+
+    # Modification not saved yet
+    aeromap_2.add_row(alt=0.0, mach=0.9, aos=0.0, aoa=0.0, cl=0.5)
+
+    with patch.object(cpacs, "load_all_aeromaps") as mock_load_all_aeromaps:
+        cpacs.delete_aeromap("aeromap_test1")
+        mock_load_all_aeromaps.assert_not_called()
+
+    # Xpaths of the following aeromaps are shifted, pending modifications are kept
+    assert aeromap_2.xpath == cpacs.tixi.uIDGetXPath("aeromap_test2") + "/aeroPerformanceMap"
+    assert aeromap_dampder.xpath == (
+        cpacs.tixi.uIDGetXPath("aeromap_test_dampder") + "/aeroPerformanceMap"
+    )
+    assert aeromap_2.get("cl", mach=0.9) == [0.5]
+
+    aeromap_2.save()
+    assert get_float_vector(cpacs.tixi, aeromap_2.xpath + "/machNumber")[-1] == 0.9
+
+    # Lazy aeromaps which are not loaded yet find their xpath when they are loaded
+    cpacs = CPACS(D150_TESTS_PATH, lazy_aeromaps=True)
+    cpacs.delete_aeromap("aeromap_test2")
+    assert not any(aeromap.is_loaded for aeromap in cpacs.aeromaps)
+    aeromap = cpacs.get_aeromap_by_uid("extended_aeromap")
+    assert aeromap.xpath == cpacs.tixi.uIDGetXPath("extended_aeromap") + "/aeroPerformanceMap"
+    assert len(aeromap.df) == 96
+
+
 def test_save_cpacs():
 
     test_path = Path(TESTS_PATH, "output.xml")